@@ -0,0 +1,62 @@
+# Generated by Django 4.2.20 on 2026-10-18 07:50
+
+from django.db import migrations, models
+
+
+def populate_paths(apps, schema_editor):
+    Comment = apps.get_model('comments', 'Comment')
+    parents = dict(Comment.objects.values_list('id', 'parent_id'))
+    paths = {}
+    for pk in parents:
+        chain = []
+        visited = set()
+        node = pk
+        while node is not None and node not in paths:
+            if node in visited:
+                raise RuntimeError(
+                    f'Comment {node} is a reply to its own thread; fix its '
+                    f'parent before migrating.'
+                )
+            chain.append(node)
+            visited.add(node)
+            node = parents[node]
+        path = paths[node] if node is not None else ''
+        for node in reversed(chain):
+            path += f'{node:010d}'
+            paths[node] = path
+    batch = []
+    for pk, path in paths.items():
+        batch.append(Comment(pk=pk, path=path, depth=len(path) // 10 - 1))
+        if len(batch) == 500:
+            Comment.objects.bulk_update(batch, ['path', 'depth'])
+            batch = []
+    Comment.objects.bulk_update(batch, ['path', 'depth'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0003_alter_comment_options_comment_parent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(populate_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'path'], name='comment_post_path_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['parent', '-created_at', '-id'], name='comment_parent_created_id_idx'),
+        ),
+    ]
@@ -1,14 +1,38 @@
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
+from django.db.models.signals import post_save, post_delete
 from django.contrib.auth.models import User
+from inspyre_api.cache import invalidate
 from posts.models import Post
 
 APPROVAL_STATUS = ((0, "Approved"), (1, "Reported"))
 
+# Width of each zero-padded id in a comment's materialized path.
+PATH_STEP = 10
+
+
+def path_segment(pk):
+    return f"{pk:0{PATH_STEP}d}"
+
+
+def subtree_range(path):
+    """
+    Return lookups matching the descendants of the comment with 'path'.
+    Paths are digits only, so the subtree is a contiguous range that an
+    index on 'path' can scan under any collation.
+    """
+    upper = path[:-PATH_STEP] + path_segment(int(path[-PATH_STEP:]) + 1)
+    return {"path__gt": path, "path__lt": upper}
+
 
 class Comment(models.Model):
     """
     Comment model, related to User and Post
     Can optionally be a reply to another comment via 'parent'.
+    'path' is the materialized path of the comment in its thread (the
+    zero-padded ids of its ancestors and itself) and 'depth' the number of
+    ancestors, so subtrees can be fetched with a range scan.
     """
 
     owner = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -24,9 +48,79 @@ class Comment(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     content = models.TextField()
     approval_status = models.IntegerField(choices=APPROVAL_STATUS, default=0)
+    path = models.TextField(blank=True, editable=False)
+    depth = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["parent__id", "-created_at"]
+        indexes = [
+            models.Index(
+                fields=["post", "path"], name="comment_post_path_idx"
+            ),
+            models.Index(
+                fields=["parent", "-created_at", "-id"],
+                name="comment_parent_created_id_idx",
+            ),
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(approval_status=1),
+                name="comment_reported_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.content
+
+
+def increment_comments_count(sender, instance, created, **kwargs):
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comments_count=F("comments_count") + 1
+        )
+
+
+def decrement_comments_count(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id, comments_count__gt=0).update(
+        comments_count=F("comments_count") - 1
+    )
+
+
+def set_path(sender, instance, **kwargs):
+    """
+    Store the comment's materialized path and depth, rewriting the paths of
+    its descendants when it has been moved under another parent.
+    """
+    if instance.path:
+        parent_segment = instance.path[-2 * PATH_STEP:-PATH_STEP]
+        parent_id = int(parent_segment) if parent_segment else None
+        if parent_id == instance.parent_id:
+            return
+    parent_path = instance.parent.path if instance.parent_id else ""
+    path = parent_path + path_segment(instance.pk)
+    depth = len(path) // PATH_STEP - 1
+    Comment.objects.filter(pk=instance.pk).update(path=path, depth=depth)
+    if instance.path:
+        Comment.objects.filter(
+            post_id=instance.post_id, **subtree_range(instance.path)
+        ).update(
+            path=Concat(Value(path), Substr("path", len(instance.path) + 1)),
+            depth=F("depth") + depth - instance.depth,
+        )
+    instance.path = path
+    instance.depth = depth
+
+
+def invalidate_comment_cache(sender, instance, **kwargs):
+    invalidate(
+        "comments",
+        f"post_comments:{instance.post_id}",
+        "posts",
+        f"post:{instance.post_id}",
+    )
+
+
+post_save.connect(set_path, sender=Comment)
+post_save.connect(increment_comments_count, sender=Comment)
+post_save.connect(invalidate_comment_cache, sender=Comment)
+post_delete.connect(decrement_comments_count, sender=Comment)
+post_delete.connect(invalidate_comment_cache, sender=Comment)
@@ -49,6 +49,27 @@ class CommentSerializer(serializers.ModelSerializer):
     def get_updated_at(self, obj):
         return naturaltime(obj.updated_at)
 
+    def validate(self, data):
+        """
+        Check that a reply is on the same post as its parent, and that a
+        comment is not moved under itself or one of its own replies.
+        """
+        parent = data.get("parent")
+        if parent is None:
+            return data
+        post = data.get("post") or self.instance.post
+        if parent.post_id != post.id:
+            raise serializers.ValidationError(
+                {"parent": "The parent comment is on another post."}
+            )
+        if self.instance is not None and parent.path.startswith(
+            self.instance.path
+        ):
+            raise serializers.ValidationError(
+                {"parent": "A comment cannot be a reply to its own thread."}
+            )
+        return data
+
     class Meta:
         model = Comment
         fields = [
@@ -67,6 +88,45 @@ class CommentSerializer(serializers.ModelSerializer):
         ]
 
 
+class CommentNodeSerializer(CommentSerializer):
+    """
+    Serializer for a single comment without its replies, used to render
+    each node of a thread. Includes the number of direct replies, which may
+    exceed those rendered when the thread is depth-limited.
+    """
+    replies_count = serializers.ReadOnlyField()
+
+    class Meta(CommentSerializer.Meta):
+        fields = [
+            field
+            for field in CommentSerializer.Meta.fields
+            if field != "replies"
+        ] + ["depth", "replies_count"]
+
+
+class CommentThreadSerializer(serializers.BaseSerializer):
+    """
+    Read-only serializer for comments whose reply trees were attached by
+    comments.threads.load_threads, annotated by with_thread_state. Each
+    comment is rendered flat and nested under its parent by walking the
+    tree with an explicit stack, so the output matches CommentSerializer
+    while thread depth costs neither queries nor recursion.
+    """
+    def to_representation(self, instance):
+        node_serializer = CommentNodeSerializer(context=self.context)
+        root = node_serializer.to_representation(instance)
+        root["replies"] = []
+        stack = [(instance, root)]
+        while stack:
+            comment, data = stack.pop()
+            for reply in comment.thread_replies:
+                reply_data = node_serializer.to_representation(reply)
+                reply_data["replies"] = []
+                data["replies"].append(reply_data)
+                stack.append((reply, reply_data))
+        return root
+
+
 class CommentDetailSerializer(CommentSerializer):
     """
     Detailed serializer for the Comment model, extending the base
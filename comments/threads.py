@@ -0,0 +1,51 @@
+from collections import defaultdict
+from django.db.models import Count, OuterRef, Q
+from inspyre_api.conditional import aggregate_subquery
+from .models import Comment, subtree_range
+
+
+def with_thread_state(queryset):
+    """
+    Join each comment's owner and profile and annotate 'replies_count', the
+    number of direct replies, so clients can offer to load replies that a
+    depth-limited thread left out. Replies by accounts pending deletion are
+    not counted.
+    """
+    return queryset.select_related("owner__profile").annotate(
+        replies_count=aggregate_subquery(
+            Comment.objects.filter(
+                parent=OuterRef("pk"), owner__is_active=True
+            ),
+            Count("pk"),
+        )
+    )
+
+
+def load_threads(roots, max_depth=None):
+    """
+    Attach the replies below each of the given comments as 'thread_replies'
+    lists (newest first), fetching the subtrees of all of them in a single
+    range scan over their materialized paths. Replies more than 'max_depth'
+    levels below their root are left out, as are replies by accounts
+    pending deletion, along with the replies below them.
+    """
+    roots = list(roots)
+    if not roots or max_depth == 0:
+        for root in roots:
+            root.thread_replies = []
+        return roots
+    subtrees = Q()
+    for root in roots:
+        subtree = Q(post_id=root.post_id, **subtree_range(root.path))
+        if max_depth is not None:
+            subtree &= Q(depth__lte=root.depth + max_depth)
+        subtrees |= subtree
+    children = defaultdict(list)
+    comments = with_thread_state(
+        Comment.objects.filter(subtrees, owner__is_active=True)
+    ).order_by("-created_at")
+    for comment in comments:
+        children[comment.parent_id].append(comment)
+    for comment in [*roots, *comments]:
+        comment.thread_replies = children[comment.pk]
+    return roots
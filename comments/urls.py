@@ -4,6 +4,11 @@ from comments import views
 urlpatterns = [
     path("comments/", views.CommentList.as_view()),
     path("comments/<int:pk>/", views.CommentDetail.as_view()),
+    path(
+        "comments/<int:pk>/replies/",
+        views.CommentReplies.as_view(),
+        name="comment-replies",
+    ),
     path(
         "comments/<int:pk>/report/",
         views.ReportComment.as_view(),
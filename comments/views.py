@@ -1,19 +1,42 @@
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
+from inspyre_api.cache import AnonymousCacheMixin, get_versions
+from inspyre_api.conditional import (
+    ConditionalGetMixin,
+    aggregate_subquery,
+    latest,
+)
+from inspyre_api.pagination import KeysetPagination
 from inspyre_api.permissions import IsOwnerOrReadOnly
+from moderation.models import Report
 from .models import Comment
-from .serializers import CommentSerializer, CommentDetailSerializer
-from rest_framework.views import APIView
-from rest_framework.response import Response
-from rest_framework import status, permissions
+from .serializers import (
+    CommentDetailSerializer,
+    CommentSerializer,
+    CommentThreadSerializer,
+)
+from .threads import load_threads, with_thread_state
+
+
+def get_max_depth(request):
+    """
+    Return the 'depth' query parameter as a number of reply levels, or None
+    (no limit) when it is absent or invalid.
+    """
+    try:
+        return max(0, int(request.query_params["depth"]))
+    except (KeyError, ValueError):
+        return None
 
 
 class ReportComment(APIView):
     """
     API view to handle reporting a comment. Updates the comment's approval
-    status to 'reported'.
+    status to 'reported' and counts the report in the moderation queue.
 
     Methods:
         put(self, request, pk): Updates the approval status of the specified
@@ -24,8 +47,7 @@ class ReportComment(APIView):
     def put(self, request, pk):
         try:
             comment = Comment.objects.get(pk=pk)
-            comment.approval_status = 1
-            comment.save()
+            Report.objects.record(comment)
             return Response(
                 {"status": "comment reported"},
                 status=status.HTTP_200_OK
@@ -37,25 +59,52 @@ class ReportComment(APIView):
             )
 
 
-class CommentList(generics.ListCreateAPIView):
+class CommentList(AnonymousCacheMixin, generics.ListCreateAPIView):
     """
     API view to list comments or create a new comment.
 
-    - GET: Retrieve a list of comments filtered by post.
+    - GET: Retrieve a list of comments filtered by post, each with its
+    nested replies, limited to 'depth' levels if given. A page of threads
+    is loaded in a constant number of queries however deep the replies go.
     - POST: Create a new comment for the authenticated user.
+
+    Anonymous GETs are served from the response cache.
     """
 
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ["post"]
+    filterset_fields = ["post", "approval_status"]
 
     def get_queryset(self):
         """
-        Return a queryset of top-level comments (excluding replies).
+        Return a queryset of top-level comments (excluding replies), leaving
+        out those of accounts pending deletion.
         """
-        return Comment.objects.filter(parent__isnull=True)
+        return with_thread_state(
+            Comment.objects.filter(parent__isnull=True, owner__is_active=True)
+        )
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        roots = load_threads(
+            queryset if page is None else page, get_max_depth(request)
+        )
+        serializer = CommentThreadSerializer(
+            roots, many=True, context=self.get_serializer_context()
+        )
+        if page is None:
+            return Response(serializer.data)
+        return self.get_paginated_response(serializer.data)
+
+    def get_cache_scopes(self):
+        post = self.request.query_params.get("post", "")
+        if post.isdigit():
+            return (f"post_comments:{int(post)}", "profile_data")
+        return ("comments", "profile_data")
 
+    @transaction.atomic
     def perform_create(self, serializer):
         """
         Save the new comment with the current user as the owner.
@@ -63,11 +112,40 @@ class CommentList(generics.ListCreateAPIView):
         serializer.save(owner=self.request.user)
 
 
-class CommentDetail(generics.RetrieveUpdateDestroyAPIView):
+class CommentReplies(generics.ListAPIView):
+    """
+    API view for loading more replies to a comment.
+
+    - GET: Retrieve the direct replies to a comment newest first, each with
+    its own replies nested up to 'depth' levels (none by default),
+    paginated by an opaque 'cursor' on (created_at, id).
+    """
+    serializer_class = CommentThreadSerializer
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        return with_thread_state(
+            Comment.objects.filter(
+                parent_id=self.kwargs["pk"], owner__is_active=True
+            )
+        )
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        max_depth = get_max_depth(request)
+        load_threads(page, 0 if max_depth is None else max_depth)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class CommentDetail(
+    ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView
+):
     """
     API view to retrieve, update, or delete a comment.
 
-    - GET: Retrieve a specific comment by ID.
+    - GET: Retrieve a specific comment by ID, or 304 when the client's ETag
+    or Last-Modified is still current.
     - PUT: Update the comment content if the user is the owner.
     - DELETE: Delete the comment if the user is the owner.
     """
@@ -75,3 +153,33 @@ class CommentDetail(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsOwnerOrReadOnly]
     serializer_class = CommentDetailSerializer
     queryset = Comment.objects.all()
+
+    def get_conditional_state(self):
+        """
+        Summarise every comment on the same post, which covers the comment,
+        its nested replies and their authors' profiles.
+        """
+        thread = Comment.objects.filter(post=OuterRef("post"))
+        state = (
+            Comment.objects.filter(pk=self.kwargs["pk"])
+            .annotate(
+                thread_count=aggregate_subquery(thread, Count("pk")),
+                thread_updated_at=aggregate_subquery(
+                    thread, Max("updated_at")
+                ),
+                profiles_updated_at=aggregate_subquery(
+                    thread, Max("owner__profile__updated_at")
+                ),
+            )
+            .values_list(
+                "post_id",
+                "thread_count",
+                "thread_updated_at",
+                "profiles_updated_at",
+            )
+            .first()
+        )
+        if state is None:
+            return None
+        scope = f"post_comments:{state[0]}"
+        return state, latest(*state[2:], get_versions([scope])[scope])
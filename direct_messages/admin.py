@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Conversation, DirectMessage
+from .models import Conversation, ConversationReadState, DirectMessage
 
 admin.site.register(Conversation)
 admin.site.register(DirectMessage)
+admin.site.register(ConversationReadState)
@@ -0,0 +1,138 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Case, IntegerField, Value, When
+from django.db.models.functions import Lower
+from inspyre_api.cache import get_versions
+
+TRIGRAM_INDEX = "auth_user_username_trgm"
+PREFIX_INDEX = "auth_user_username_prefix"
+# pg_trgm cannot narrow down LIKE patterns shorter than one trigram.
+TRIGRAM_MIN_LENGTH = 3
+CACHE_SCOPES = ["usernames", "profile_data"]
+
+
+def create_index(schema_editor):
+    """
+    Create the username search indexes on PostgreSQL: a trigram GIN index
+    for substring matches and a pattern btree index for prefix matches,
+    both over UPPER(username) as used by Django's case-insensitive lookups.
+    Other databases scan the table.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON auth_user "
+        "USING gin (UPPER(username::text) gin_trgm_ops)"
+    )
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {PREFIX_INDEX} ON auth_user "
+        "(UPPER(username::text) text_pattern_ops)"
+    )
+
+
+def drop_index(schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {TRIGRAM_INDEX}")
+    schema_editor.execute(f"DROP INDEX IF EXISTS {PREFIX_INDEX}")
+
+
+def rank_key(username, term):
+    """
+    Sort key placing an exact match first, then prefix matches, then other
+    substring matches, each alphabetically.
+    """
+    username = username.lower()
+    if username == term:
+        rank = 0
+    elif username.startswith(term):
+        rank = 1
+    else:
+        rank = 2
+    return rank, username
+
+
+def find_users(term, limit, contains):
+    """
+    Return up to 'limit' active users matching the lowercased 'term' in
+    rank_key order, with their profiles joined. Only prefixes are matched
+    unless 'contains' is set.
+    """
+    lookup = "username__icontains" if contains else "username__istartswith"
+    return list(
+        User.objects.filter(is_active=True, **{lookup: term})
+        .select_related("profile")
+        .annotate(
+            rank=Case(
+                When(username__iexact=term, then=Value(0)),
+                When(username__istartswith=term, then=Value(1)),
+                default=Value(2),
+                output_field=IntegerField(),
+            )
+        )
+        .order_by("rank", Lower("username"))[:limit]
+    )
+
+
+def autocomplete(term, serialize, namespace=""):
+    """
+    Return the serialized users best matching 'term', at most
+    USERNAME_AUTOCOMPLETE_LIMIT of them, ranked by rank_key. Substrings are
+    matched, except for terms too short for PostgreSQL's trigram index,
+    which only match prefixes there.
+
+    Results are cached per term for USERNAME_AUTOCOMPLETE_CACHE_TIMEOUT
+    seconds. While a user keeps typing, a cached result for an earlier
+    prefix that held every match is filtered instead of querying again.
+    'serialize' turns a list of users into a list of dicts with a
+    'username'; 'namespace' separates results serialized differently.
+    """
+    term = term.strip().lower()
+    limit = settings.USERNAME_AUTOCOMPLETE_LIMIT
+    contains = (
+        connections[User.objects.db].vendor != "postgresql"
+        or len(term) >= TRIGRAM_MIN_LENGTH
+    )
+    versions = get_versions(CACHE_SCOPES)
+    tokens = ":".join(str(versions[scope]) for scope in CACHE_SCOPES)
+    keys = {
+        f"autocomplete:{namespace}:{tokens}:{term[:length]}": length
+        for length in range(len(term), 0, -1)
+    }
+    found = cache.get_many(keys)
+    results = None
+    for key, length in keys.items():
+        entry = found.get(key)
+        if entry is None:
+            continue
+        if length == len(term):
+            return entry["users"]
+        if entry["complete"] and (entry["contains"] or not contains):
+            results = sorted(
+                (
+                    user
+                    for user in entry["users"]
+                    if (
+                        term in user["username"].lower()
+                        if contains
+                        else user["username"].lower().startswith(term)
+                    )
+                ),
+                key=lambda user: rank_key(user["username"], term),
+            )
+            break
+    if results is None:
+        users = find_users(term, limit + 1, contains)
+        results = serialize(users[:limit])
+        complete = len(users) <= limit
+    else:
+        complete = True
+    cache.set(
+        f"autocomplete:{namespace}:{tokens}:{term}",
+        {"users": results, "complete": complete, "contains": contains},
+        settings.USERNAME_AUTOCOMPLETE_CACHE_TIMEOUT,
+    )
+    return results
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.20 on 2026-10-18 08:12
+
+from django.db import migrations
+from direct_messages import autocomplete
+
+
+def create_username_index(apps, schema_editor):
+    autocomplete.create_index(schema_editor)
+
+
+def drop_username_index(apps, schema_editor):
+    autocomplete.drop_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('direct_messages', '0002_conversation_directmessage_conversation'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_username_index, drop_username_index),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.20 on 2026-10-18 08:10
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Q
+import django.db.models.deletion
+
+
+def populate_read_states(apps, schema_editor):
+    Conversation = apps.get_model('direct_messages', 'Conversation')
+    DirectMessage = apps.get_model('direct_messages', 'DirectMessage')
+    ConversationReadState = apps.get_model(
+        'direct_messages', 'ConversationReadState'
+    )
+    unread = Q(read=False)
+    received = {
+        (row['conversation_id'], row['receiver_id']): row
+        for row in DirectMessage.objects.filter(receiver__isnull=False)
+        .order_by()
+        .values('conversation_id', 'receiver_id')
+        .annotate(
+            unread_count=Count('pk', filter=unread),
+            first_unread_id=Min('pk', filter=unread),
+            last_id=Max('pk'),
+        )
+    }
+    states = []
+    participants = Conversation.participants.through.objects.values_list(
+        'conversation_id', 'user_id'
+    )
+    for conversation_id, user_id in participants.iterator():
+        row = received.get((conversation_id, user_id))
+        state = ConversationReadState(
+            conversation_id=conversation_id, user_id=user_id
+        )
+        if row is not None:
+            # The cursor stops before the first unread message, so that
+            # messages still flagged unread stay unread.
+            state.unread_count = row['unread_count']
+            state.last_read_message_id = (
+                row['first_unread_id'] - 1
+                if row['unread_count']
+                else row['last_id']
+            )
+        states.append(state)
+    ConversationReadState.objects.bulk_create(states, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('direct_messages', '0003_username_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationReadState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_read_message_id', models.BigIntegerField(blank=True, null=True)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_states', to='direct_messages.conversation')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversation_read_states', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('conversation', 'user')},
+            },
+        ),
+        migrations.RunPython(
+            populate_read_states, migrations.RunPython.noop
+        ),
+    ]
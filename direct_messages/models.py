@@ -1,6 +1,29 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.utils.text import Truncator
+from inspyre_api.cache import invalidate
+
+
+class ConversationQuerySet(models.QuerySet):
+    """
+    QuerySet for the Conversation model, providing viewer-specific state.
+    """
+    def with_viewer_state(self, user):
+        """
+        Annotate each conversation with 'viewer_unread_count', the number
+        of messages the given user has not read in it, from their read
+        state.
+        """
+        return self.annotate(
+            viewer_unread_count=models.Subquery(
+                ConversationReadState.objects.filter(
+                    conversation=models.OuterRef("pk"), user=user
+                ).values("unread_count")[:1]
+            )
+        )
 
 
 class Conversation(models.Model):
@@ -11,12 +34,40 @@ class Conversation(models.Model):
     participants = models.ManyToManyField(User)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = ConversationQuerySet.as_manager()
+
     def __str__(self):
         return f"Conversation between {', '.join(
             [user.username for user in self.participants.all()]
             )}"
 
 
+class DirectMessageQuerySet(models.QuerySet):
+    """
+    QuerySet for the DirectMessage model, providing the read state of
+    messages under their receivers' read cursors.
+    """
+    def with_read_state(self):
+        """
+        Annotate each message with 'is_read': whether it is flagged read or
+        falls at or before its receiver's read cursor in the conversation.
+        """
+        cursor = ConversationReadState.objects.filter(
+            conversation=models.OuterRef("conversation"),
+            user=models.OuterRef("receiver"),
+        ).values("last_read_message_id")[:1]
+        return self.annotate(
+            is_read=models.Case(
+                models.When(
+                    Q(read=True) | Q(pk__lte=models.Subquery(cursor)),
+                    then=models.Value(True),
+                ),
+                default=models.Value(False),
+                output_field=models.BooleanField(),
+            )
+        )
+
+
 class DirectMessage(models.Model):
     """
     Model representing a private message between two users within a
@@ -29,7 +80,9 @@ class DirectMessage(models.Model):
         conversation (Conversation): The conversation thread to which this
         message belongs.
         content (str): The content of the message.
-        read (bool): Indicates whether the message has been read.
+        read (bool): Set when the message is read on its own. Messages
+        read by opening the conversation are read through the receiver's
+        ConversationReadState instead.
     """
 
     sender = models.ForeignKey(
@@ -48,6 +101,8 @@ class DirectMessage(models.Model):
     content = models.TextField()
     read = models.BooleanField(default=False)
 
+    objects = DirectMessageQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
 
@@ -62,3 +117,176 @@ class DirectMessage(models.Model):
     def preview(self):
         """Return a short preview of the message content."""
         return Truncator(self.content).words(10)
+
+    def read_by_receiver(self):
+        """
+        Return whether the receiver has read the message, either on its own
+        or by reading the conversation past it.
+        """
+        if self.read:
+            return True
+        return ConversationReadState.objects.filter(
+            conversation_id=self.conversation_id,
+            user_id=self.receiver_id,
+            last_read_message_id__gte=self.pk,
+        ).exists()
+
+    def mark_read(self):
+        """
+        Flag the message as read and take it off its receiver's unread
+        count, unless they have already read it.
+        """
+        if self.read_by_receiver():
+            return
+        with transaction.atomic():
+            self.read = True
+            self.save(update_fields=["read", "updated_at"])
+            ConversationReadState.objects.filter(
+                conversation_id=self.conversation_id,
+                user_id=self.receiver_id,
+                unread_count__gt=0,
+            ).update(unread_count=F("unread_count") - 1)
+
+    def mark_unread(self):
+        """
+        Flag the message as unread. If the receiver's read cursor is past
+        it, the cursor is moved back before it, and the later messages it
+        covered are flagged read so that they stay read.
+        """
+        with transaction.atomic():
+            state = (
+                ConversationReadState.objects.select_for_update()
+                .filter(
+                    conversation_id=self.conversation_id,
+                    user_id=self.receiver_id,
+                )
+                .first()
+            )
+            self.read = False
+            self.save(update_fields=["read", "updated_at"])
+            if state is None:
+                return
+            cursor = state.last_read_message_id
+            if cursor is not None and cursor >= self.pk:
+                DirectMessage.objects.filter(
+                    conversation_id=self.conversation_id,
+                    receiver_id=self.receiver_id,
+                    pk__gt=self.pk,
+                    pk__lte=cursor,
+                    read=False,
+                ).update(read=True)
+                state.last_read_message_id = self.pk - 1
+            state.unread_count = state.unread_messages().count()
+            state.save()
+
+
+class ConversationReadState(models.Model):
+    """
+    Model recording how far a participant has read a conversation: every
+    message they received up to 'last_read_message_id' is read, and
+    'unread_count' counts their unread messages after it. Reading a
+    conversation is then a single row update, and checking for unread
+    messages a single row read.
+    """
+    conversation = models.ForeignKey(
+        Conversation, related_name="read_states", on_delete=models.CASCADE
+    )
+    user = models.ForeignKey(
+        User,
+        related_name="conversation_read_states",
+        on_delete=models.CASCADE,
+    )
+    last_read_message_id = models.BigIntegerField(null=True, blank=True)
+    unread_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ["conversation", "user"]
+
+    def __str__(self):
+        return f"{self.user} in conversation {self.conversation_id}"
+
+    def unread_messages(self):
+        """
+        Return the messages the participant has not read.
+        """
+        messages = DirectMessage.objects.filter(
+            conversation_id=self.conversation_id,
+            receiver_id=self.user_id,
+            read=False,
+        )
+        if self.last_read_message_id is not None:
+            messages = messages.filter(pk__gt=self.last_read_message_id)
+        return messages
+
+
+def mark_conversation_read(conversation, user):
+    """
+    Move the user's read cursor to the latest message of the conversation
+    and clear their unread count, in a single update. Nothing is written
+    when they have no unread messages.
+    """
+    latest_id = models.Subquery(
+        DirectMessage.objects.filter(conversation=conversation)
+        .order_by("-pk")
+        .values("pk")[:1]
+    )
+    ConversationReadState.objects.filter(
+        conversation=conversation, user=user, unread_count__gt=0
+    ).update(
+        last_read_message_id=latest_id,
+        unread_count=0,
+        updated_at=timezone.now(),
+    )
+
+
+def invalidate_username_cache(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or "username" in update_fields:
+        invalidate("usernames")
+
+
+def create_read_states(sender, instance, action, pk_set, **kwargs):
+    if action == "post_add" and pk_set:
+        ConversationReadState.objects.bulk_create(
+            [
+                ConversationReadState(conversation=instance, user_id=pk)
+                for pk in pk_set
+            ],
+            ignore_conflicts=True,
+        )
+
+
+def increment_unread_count(sender, instance, created, **kwargs):
+    if not created or instance.receiver_id is None:
+        return
+    states = ConversationReadState.objects.filter(
+        conversation_id=instance.conversation_id,
+        user_id=instance.receiver_id,
+    )
+    if not states.update(unread_count=F("unread_count") + 1):
+        ConversationReadState.objects.get_or_create(
+            conversation_id=instance.conversation_id,
+            user_id=instance.receiver_id,
+        )
+        states.update(unread_count=F("unread_count") + 1)
+
+
+def decrement_unread_count(sender, instance, **kwargs):
+    if instance.read or instance.receiver_id is None:
+        return
+    ConversationReadState.objects.filter(
+        Q(last_read_message_id__isnull=True)
+        | Q(last_read_message_id__lt=instance.pk),
+        conversation_id=instance.conversation_id,
+        user_id=instance.receiver_id,
+        unread_count__gt=0,
+    ).update(unread_count=F("unread_count") - 1)
+
+
+m2m_changed.connect(
+    create_read_states, sender=Conversation.participants.through
+)
+post_save.connect(increment_unread_count, sender=DirectMessage)
+post_delete.connect(decrement_unread_count, sender=DirectMessage)
+post_save.connect(invalidate_username_cache, sender=User)
+post_delete.connect(invalidate_username_cache, sender=User)
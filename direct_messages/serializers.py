@@ -31,6 +31,7 @@ class DirectMessageSerializer(serializers.ModelSerializer):
     sender = UserSerializer(read_only=True)
     receiver = UserSerializer(read_only=True)
     preview = serializers.ReadOnlyField()
+    read = serializers.SerializerMethodField()
 
     class Meta:
         model = DirectMessage
@@ -82,6 +83,15 @@ class DirectMessageSerializer(serializers.ModelSerializer):
         )
         return message
 
+    def get_read(self, obj):
+        """
+        Whether the receiver has read the message, on its own or by reading
+        the conversation, using the 'is_read' annotation when present.
+        """
+        if hasattr(obj, "is_read"):
+            return obj.is_read
+        return obj.read_by_receiver()
+
 
 class ConversationSerializer(serializers.ModelSerializer):
     """
@@ -109,7 +119,9 @@ class ConversationSerializer(serializers.ModelSerializer):
         ]
 
     def get_latest_message(self, obj):
-        latest = obj.messages.order_by("-created_at").first()
+        latest = (
+            obj.messages.with_read_state().order_by("-created_at").first()
+        )
         return DirectMessageSerializer(latest).data if latest else None
 
     def get_other_user(self, obj):
@@ -120,7 +132,10 @@ class ConversationSerializer(serializers.ModelSerializer):
 
     def get_has_unread_messages(self, obj):
         """
-        Check if the user has any unread messages in this conversation.
+        Check if the user has any unread messages in this conversation,
+        from their read state.
         """
+        if hasattr(obj, "viewer_unread_count"):
+            return bool(obj.viewer_unread_count)
         user = self.context["request"].user
-        return obj.messages.filter(receiver=user, read=False).exists()
+        return obj.read_states.filter(user=user, unread_count__gt=0).exists()
@@ -6,8 +6,20 @@ from rest_framework.generics import ListCreateAPIView, ListAPIView
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.contrib.auth.models import User
-from django.db.models import Q
-from .models import DirectMessage, Conversation
+from django.db.models import Count, Max, OuterRef
+from inspyre_api.conditional import (
+    ConditionalGetMixin,
+    aggregate_subquery,
+    latest,
+)
+from profiles.models import Profile
+from .autocomplete import autocomplete
+from .models import (
+    Conversation,
+    ConversationReadState,
+    DirectMessage,
+    mark_conversation_read,
+)
 from .serializers import DirectMessageSerializer, ConversationSerializer
 from .serializers import UserSerializer
 
@@ -23,6 +35,23 @@ class MessagePagination(PageNumberPagination):
     max_page_size = 100
 
 
+class MessageOrderingFilter(OrderingFilter):
+    """
+    Ordering filter that orders messages by their effective read state
+    when asked to order by 'read'.
+    """
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        return [
+            term.replace("read", "is_read")
+            if term.lstrip("-") == "read"
+            else term
+            for term in ordering
+        ]
+
+
 class MessageListAPIView(ListCreateAPIView):
     """
     API view for listing and creating direct messages.
@@ -35,13 +64,13 @@ class MessageListAPIView(ListCreateAPIView):
     serializer_class = DirectMessageSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = MessagePagination
-    filter_backends = [OrderingFilter]
+    filter_backends = [MessageOrderingFilter]
     ordering_fields = ["created_at", "read"]
 
     def get_queryset(self):
         """
         Automatically mark unread messages as read when the conversation
-        is accessed.
+        is accessed, by moving the user's read cursor to its latest message.
         """
         conversation_id = self.request.GET.get("conversation_id")
         if conversation_id:
@@ -53,16 +82,13 @@ class MessageListAPIView(ListCreateAPIView):
             if self.request.user not in conversation.participants.all():
                 return DirectMessage.objects.none()
 
-            # Mark unread messages as read
-            DirectMessage.objects.filter(
-                conversation=conversation,
-                receiver=self.request.user,
-                read=False
-            ).update(read=True)
+            mark_conversation_read(conversation, self.request.user)
 
-            return DirectMessage.objects.filter(
-                conversation=conversation
-            ).select_related("sender", "receiver")
+            return (
+                DirectMessage.objects.filter(conversation=conversation)
+                .select_related("sender", "receiver")
+                .with_read_state()
+            )
 
         return DirectMessage.objects.none()
 
@@ -79,9 +105,11 @@ class MessageDetailAPIView(APIView):
 
     def get(self, request, message_id):
         try:
-            message = DirectMessage.objects.select_related(
-                "sender", "receiver"
-            ).get(id=message_id)
+            message = (
+                DirectMessage.objects.select_related("sender", "receiver")
+                .with_read_state()
+                .get(id=message_id)
+            )
 
             if (
                 message.sender != request.user and
@@ -95,9 +123,9 @@ class MessageDetailAPIView(APIView):
                     status=status.HTTP_403_FORBIDDEN,
                 )
 
-            if message.receiver == request.user and not message.read:
-                message.read = True
-                message.save()
+            if message.receiver == request.user and not message.is_read:
+                message.mark_read()
+                message.is_read = True
 
             serializer = DirectMessageSerializer(message)
             return Response(serializer.data)
@@ -119,8 +147,14 @@ class MessageDetailAPIView(APIView):
                     },
                     status=status.HTTP_403_FORBIDDEN,
                 )
-            message.read = request.data.get("read", message.read)
-            message.save()
+            if "read" in request.data:
+                read = serializers.BooleanField().to_internal_value(
+                    request.data["read"]
+                )
+                if read:
+                    message.mark_read()
+                else:
+                    message.mark_unread()
             serializer = DirectMessageSerializer(message)
             return Response(serializer.data)
         except DirectMessage.DoesNotExist:
@@ -159,22 +193,70 @@ class ConversationListAPIView(ListAPIView):
     pagination_class = MessagePagination
 
     def get_queryset(self):
-        return Conversation.objects.filter(
-            participants=self.request.user
-        ).order_by("-created_at")
+        return (
+            Conversation.objects.filter(participants=self.request.user)
+            .with_viewer_state(self.request.user)
+            .order_by("-created_at")
+        )
 
 
-class ConversationDetailAPIView(APIView):
+class ConversationDetailAPIView(ConditionalGetMixin, APIView):
     """
     API view for retrieving or deleting a specific conversation.
 
-    - GET: Retrieve the conversation by ID.
+    - GET: Retrieve the conversation by ID, or 304 when the client's ETag or
+    Last-Modified is still current.
     - DELETE: Delete the conversation if the user is a participant.
     """
 
     permission_classes = [IsAuthenticated]
 
+    def get_conditional_state(self):
+        user = self.request.user
+        messages = DirectMessage.objects.filter(conversation=OuterRef("pk"))
+        read_states = ConversationReadState.objects.filter(
+            conversation=OuterRef("pk")
+        )
+        state = (
+            Conversation.objects.filter(
+                pk=self.kwargs["conversation_id"], participants=user
+            )
+            .annotate(
+                messages_count=aggregate_subquery(messages, Count("pk")),
+                unread_count=aggregate_subquery(
+                    read_states.filter(user=user), Max("unread_count")
+                ),
+                messages_updated_at=aggregate_subquery(
+                    messages, Max("updated_at")
+                ),
+                read_states_updated_at=aggregate_subquery(
+                    read_states, Max("updated_at")
+                ),
+                participants_updated_at=aggregate_subquery(
+                    Profile.objects.filter(
+                        owner__conversation=OuterRef("pk")
+                    ),
+                    Max("updated_at"),
+                ),
+            )
+            .values_list(
+                "messages_count",
+                "unread_count",
+                "created_at",
+                "messages_updated_at",
+                "read_states_updated_at",
+                "participants_updated_at",
+            )
+            .first()
+        )
+        if state is None:
+            return None
+        return state, latest(*state[2:])
+
     def get(self, request, conversation_id):
+        return self.conditional_get(request, self.retrieve, conversation_id)
+
+    def retrieve(self, request, conversation_id):
         try:
             conversation = Conversation.objects.get(id=conversation_id)
             if request.user not in conversation.participants.all():
@@ -219,17 +301,26 @@ class UserListAPIView(ListAPIView):
     """
     API view for listing users, with optional search and ordering
     functionality.
+
+    With a 'search' term the view autocompletes usernames instead, returning
+    a plain list (not paginated) of at most USERNAME_AUTOCOMPLETE_LIMIT
+    users: the exact match first, then prefix matches, then other substring
+    matches, served from a short-lived per-term cache.
     """
 
-    queryset = User.objects.all()
+    queryset = User.objects.filter(is_active=True).select_related("profile")
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [OrderingFilter]
     ordering_fields = ["username"]
 
-    def get_queryset(self):
-        queryset = User.objects.all()
-        search = self.request.query_params.get("search", None)
-        if search:
-            queryset = queryset.filter(username__icontains=search)
-        return queryset
+    def list(self, request, *args, **kwargs):
+        search = request.query_params.get("search", "").strip()
+        if not search:
+            return super().list(request, *args, **kwargs)
+        results = autocomplete(
+            search,
+            lambda users: list(self.get_serializer(users, many=True).data),
+            namespace=request.get_host(),
+        )
+        return Response(results)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class FollowersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "followers"
+
+    def ready(self):
+        from . import graph  # noqa: F401 (connects the graph's receivers)
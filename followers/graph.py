@@ -0,0 +1,389 @@
+import logging
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from datetime import timedelta
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Max
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from .models import FollowChange, Follower
+
+logger = logging.getLogger(__name__)
+
+
+class Adjacency:
+    """
+    One direction of the follow graph in compressed sparse row form: the
+    sorted ids of users with at least one edge ('nodes'), and flat arrays
+    of neighbour ids ('targets') and follow ids ('values') in which each
+    node's edges form a run, sorted by neighbour, between consecutive
+    'offsets'. Lookups are two binary searches over machine-int arrays.
+
+    Adjacencies are never modified once built, so readers need no lock.
+    Changes are applied by apply(), which returns a new adjacency sharing
+    the arrays and keeping the changed edges in small per-user overlays:
+    'added' maps a user to {neighbour: follow id} for edges missing from
+    the arrays (or re-created with a new id), 'removed' to the neighbours
+    whose edges in the arrays are gone. compact() folds them in.
+    """
+    def __init__(self, edges=()):
+        """
+        Build from (source, target, value) triples sorted by source, then
+        target.
+        """
+        self.nodes = array("q")
+        self.offsets = array("q", [0])
+        self.targets = array("q")
+        self.values = array("q")
+        for source, target, value in edges:
+            if not self.nodes or self.nodes[-1] != source:
+                if self.nodes:
+                    self.offsets.append(len(self.targets))
+                self.nodes.append(source)
+            self.targets.append(target)
+            self.values.append(value)
+        if self.nodes:
+            self.offsets.append(len(self.targets))
+        self.added = {}
+        self.removed = {}
+        self.pending = 0
+
+    def run(self, source):
+        i = bisect_left(self.nodes, source)
+        if i < len(self.nodes) and self.nodes[i] == source:
+            return self.offsets[i], self.offsets[i + 1]
+        return 0, 0
+
+    def base_value(self, source, target):
+        lo, hi = self.run(source)
+        i = bisect_left(self.targets, target, lo, hi)
+        if i < hi and self.targets[i] == target:
+            return self.values[i]
+        return None
+
+    def get(self, source, target):
+        """
+        Return the value of the edge from source to target, or None.
+        """
+        added = self.added.get(source)
+        if added and target in added:
+            return added[target]
+        if target in self.removed.get(source, ()):
+            return None
+        return self.base_value(source, target)
+
+    def degree(self, source):
+        lo, hi = self.run(source)
+        return (
+            hi
+            - lo
+            + len(self.added.get(source, ()))
+            - len(self.removed.get(source, ()))
+        )
+
+    def neighbours(self, source):
+        """
+        Return the sorted ids of the source's neighbours.
+        """
+        lo, hi = self.run(source)
+        removed = self.removed.get(source, ())
+        targets = {
+            target for target in self.targets[lo:hi] if target not in removed
+        }
+        return sorted(targets.union(self.added.get(source, ())))
+
+    def apply(self, changes):
+        """
+        Return a new adjacency with the (source, target, value) changes
+        applied in order, where a value of None removes the edge. Only the
+        overlays of the changed sources are copied.
+        """
+        new = Adjacency()
+        new.nodes, new.offsets = self.nodes, self.offsets
+        new.targets, new.values = self.targets, self.values
+        new.added, new.removed = dict(self.added), dict(self.removed)
+        new.pending = self.pending
+        for source, target, value in changes:
+            added = dict(new.added.get(source, {}))
+            removed = set(new.removed.get(source, ()))
+            new.pending -= len(added) + len(removed)
+            base_value = self.base_value(source, target)
+            added.pop(target, None)
+            if value is None:
+                if base_value is not None:
+                    removed.add(target)
+            elif value == base_value:
+                removed.discard(target)
+            else:
+                added[target] = value
+                if base_value is not None:
+                    removed.add(target)
+            new.pending += len(added) + len(removed)
+            for overlay, entries in (
+                (new.added, added), (new.removed, frozenset(removed))
+            ):
+                if entries:
+                    overlay[source] = entries
+                else:
+                    overlay.pop(source, None)
+        return new
+
+    def edges(self):
+        """
+        Yield every current (source, target, value) triple in sorted order.
+        """
+        sources = sorted(set(self.nodes).union(self.added))
+        for source in sources:
+            for target in self.neighbours(source):
+                yield source, target, self.get(source, target)
+
+    def compact(self):
+        """
+        Return a new adjacency with the overlays folded into the arrays.
+        """
+        return Adjacency(self.edges())
+
+
+class FollowGraph:
+    """
+    Immutable snapshot of all follow relationships, answering relationship
+    and count queries without touching the database.
+
+    The snapshot also records how far it has read the FollowChange log:
+    every change up to 'cursor' is applied, as are the changes in 'seen'
+    (mapping ids above the cursor to their creation times). Ids missing
+    between them belong to transactions that had not committed yet, and
+    are waited for until FOLLOW_GRAPH_LOG_GRACE has passed.
+    """
+    def __init__(self, following, followers, cursor, seen, synced_at):
+        self.following = following
+        self.followers = followers
+        self.cursor = cursor
+        self.seen = seen
+        self.synced_at = synced_at
+
+    @classmethod
+    def load(cls):
+        """
+        Build the graph from the followers table, streaming each direction
+        in index order. Its log cursor is placed before the changes that
+        may still have been uncommitted, which are replayed on top.
+        """
+        synced_at = timezone.now()
+        cursor = FollowChange.objects.filter(
+            created_at__lt=synced_at - log_grace()
+        ).aggregate(cursor=Max("id"))["cursor"]
+        edges = Follower.objects.order_by()
+        following = Adjacency(
+            edges.order_by("owner_id", "followed_id")
+            .values_list("owner_id", "followed_id", "id")
+            .iterator(chunk_size=10000)
+        )
+        followers = Adjacency(
+            edges.order_by("followed_id", "owner_id")
+            .values_list("followed_id", "owner_id", "id")
+            .iterator(chunk_size=10000)
+        )
+        return cls(following, followers, cursor or 0, {}, synced_at)
+
+    def follow_id(self, user_id, other_id):
+        """
+        Return the id of the user's follow of the other user, or None.
+        """
+        return self.following.get(user_id, other_id)
+
+    def follows(self, user_id, other_id):
+        return self.follow_id(user_id, other_id) is not None
+
+    def is_mutual(self, user_id, other_id):
+        return self.follows(user_id, other_id) and self.follows(
+            other_id, user_id
+        )
+
+    def following_count(self, user_id):
+        return self.following.degree(user_id)
+
+    def followers_count(self, user_id):
+        return self.followers.degree(user_id)
+
+    def following_ids(self, user_id):
+        return self.following.neighbours(user_id)
+
+    def follower_ids(self, user_id):
+        return self.followers.neighbours(user_id)
+
+    def mutual_ids(self, user_id):
+        """
+        Return the sorted ids of users who follow the user back.
+        """
+        followers = set(self.follower_ids(user_id))
+        return [
+            other_id
+            for other_id in self.following_ids(user_id)
+            if other_id in followers
+        ]
+
+    def is_applied(self, change_id):
+        return change_id <= self.cursor or change_id in self.seen
+
+    def apply(self, changes, synced_at=None):
+        """
+        Return a new snapshot with the FollowChange rows applied, skipping
+        those already applied, and the log cursor moved past them.
+        """
+        changes = [
+            change for change in changes if not self.is_applied(change.id)
+        ]
+        following, followers = self.following, self.followers
+        if changes:
+            following = following.apply(
+                (change.owner_id, change.followed_id, change.follow_id)
+                for change in changes
+            )
+            followers = followers.apply(
+                (change.followed_id, change.owner_id, change.follow_id)
+                for change in changes
+            )
+        if following.pending > settings.FOLLOW_GRAPH_COMPACT_THRESHOLD:
+            following = following.compact()
+            followers = followers.compact()
+        seen = dict(self.seen)
+        seen.update((change.id, change.created_at) for change in changes)
+        cursor = self.cursor
+        expired = timezone.now() - log_grace()
+        for change_id in sorted(seen):
+            # Skip gaps left by transactions that are long rolled back.
+            if change_id == cursor + 1 or seen[change_id] < expired:
+                cursor = change_id
+                del seen[change_id]
+            else:
+                break
+        return FollowGraph(
+            following, followers, cursor, seen, synced_at or self.synced_at
+        )
+
+    def refresh(self):
+        """
+        Return a snapshot with the changes logged by all processes since
+        this one applied, or a fresh load when the log has been pruned past
+        its cursor.
+        """
+        now = timezone.now()
+        if now - self.synced_at > log_retention() / 2:
+            return FollowGraph.load()
+        changes = FollowChange.objects.filter(id__gt=self.cursor).order_by(
+            "id"
+        )
+        return self.apply(changes, synced_at=now)
+
+
+def log_grace():
+    return timedelta(seconds=settings.FOLLOW_GRAPH_LOG_GRACE)
+
+
+def log_retention():
+    return timedelta(seconds=settings.FOLLOW_GRAPH_LOG_RETENTION)
+
+
+_graph = None
+_checked_at = 0
+_loader = None
+_lock = threading.Lock()
+
+
+def get_graph():
+    """
+    Return this process's current follow graph snapshot, or None while it
+    is being built from the database by a background thread, started on
+    first use. At most every FOLLOW_GRAPH_CHECK_INTERVAL seconds, one
+    request thread reads the changes logged since and swaps in an updated
+    snapshot; the others keep using the current one.
+    """
+    global _graph, _checked_at
+    graph = _graph
+    if graph is None:
+        _start_loader()
+        return None
+    if time.monotonic() - _checked_at < settings.FOLLOW_GRAPH_CHECK_INTERVAL:
+        return graph
+    if not _lock.acquire(blocking=False):
+        return graph
+    try:
+        _checked_at = time.monotonic()
+        _graph = _graph.refresh()
+        return _graph
+    finally:
+        _lock.release()
+
+
+def _load():
+    global _graph, _checked_at, _loader
+    try:
+        graph = FollowGraph.load()
+    except Exception:
+        logger.exception("Loading the follow graph failed")
+        graph = None
+    finally:
+        # The loader thread holds its own connections; release them.
+        connections.close_all()
+    with _lock:
+        if graph is not None:
+            _graph = graph
+            _checked_at = time.monotonic()
+        # Cleared on failure too, so the next use retries.
+        _loader = None
+
+
+def _start_loader():
+    global _loader
+    with _lock:
+        if _graph is None and _loader is None:
+            _loader = threading.Thread(
+                target=_load, name="follow-graph-loader", daemon=True
+            )
+            _loader.start()
+
+
+def apply_change(change):
+    """
+    Apply a follow change committed by this process to its graph at once,
+    so that its own requests see it without waiting for the next refresh.
+    """
+    global _graph
+    with _lock:
+        if _graph is not None:
+            _graph = _graph.apply([change])
+
+
+def log_change(instance, following):
+    """
+    Record the follow or unfollow in the FollowChange log, in the same
+    transaction, and apply it to this process's graph once it commits.
+    Log entries past the retention period are pruned now and then.
+    """
+    change = FollowChange.objects.create(
+        owner_id=instance.owner_id,
+        followed_id=instance.followed_id,
+        follow_id=instance.pk if following else None,
+    )
+    transaction.on_commit(lambda: apply_change(change))
+    if change.id % 1000 == 0:
+        FollowChange.objects.filter(
+            created_at__lt=change.created_at - log_retention()
+        ).delete()
+
+
+def log_follow(sender, instance, created, **kwargs):
+    if created:
+        log_change(instance, True)
+
+
+def log_unfollow(sender, instance, **kwargs):
+    log_change(instance, False)
+
+
+post_save.connect(log_follow, sender=Follower)
+post_delete.connect(log_unfollow, sender=Follower)
@@ -0,0 +1,99 @@
+import random
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from followers.graph import FollowGraph
+from followers.models import Follower
+
+
+class Command(BaseCommand):
+    """
+    Management command that compares relationship queries answered by the
+    in-memory follow graph with the equivalent ORM queries, over random
+    pairs of existing users (half of them known follows).
+    """
+    help = "Benchmark the in-memory follow graph against the ORM."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queries",
+            type=int,
+            default=1000,
+            help="Number of queries per operation and path.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed for choosing the user pairs.",
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        user_ids = list(User.objects.values_list("id", flat=True))
+        edges = list(
+            Follower.objects.values_list("owner_id", "followed_id")[:10000]
+        )
+        if not edges:
+            raise CommandError("There are no follows to benchmark.")
+        pairs = [
+            rng.choice(edges)
+            if i % 2
+            else (rng.choice(user_ids), rng.choice(user_ids))
+            for i in range(options["queries"])
+        ]
+
+        started = time.perf_counter()
+        graph = FollowGraph.load()
+        self.stdout.write(
+            f"build: {time.perf_counter() - started:.3f}s for "
+            f"{len(graph.following.targets)} follow(s)"
+        )
+
+        def orm_follows(user_id, other_id):
+            return Follower.objects.filter(
+                owner_id=user_id, followed_id=other_id
+            ).exists()
+
+        def orm_followers_count(user_id, other_id):
+            return Follower.objects.filter(followed_id=other_id).count()
+
+        def orm_is_mutual(user_id, other_id):
+            return (
+                Follower.objects.filter(
+                    Q(owner_id=user_id, followed_id=other_id)
+                    | Q(owner_id=other_id, followed_id=user_id)
+                ).count()
+                == 2
+            )
+
+        operations = (
+            ("follows", graph.follows, orm_follows),
+            (
+                "followers_count",
+                lambda user_id, other_id: graph.followers_count(other_id),
+                orm_followers_count,
+            ),
+            ("is_mutual", graph.is_mutual, orm_is_mutual),
+        )
+        for name, graph_query, orm_query in operations:
+            graph_time, graph_results = self.run(graph_query, pairs)
+            orm_time, orm_results = self.run(orm_query, pairs)
+            if graph_results != orm_results:
+                raise CommandError(f"{name}: graph and ORM results differ.")
+            self.stdout.write(
+                f"{name}: graph {graph_time:.2f}us, "
+                f"ORM {orm_time:.2f}us per query "
+                f"({orm_time / graph_time:.0f}x)"
+            )
+
+    def run(self, query, pairs):
+        """
+        Run the query over all pairs, returning the mean time per query in
+        microseconds and the results.
+        """
+        started = time.perf_counter()
+        results = [query(user_id, other_id) for user_id, other_id in pairs]
+        elapsed = time.perf_counter() - started
+        return elapsed / len(pairs) * 1e6, results
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.20 on 2026-10-18 07:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('followers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='follower',
+            index=models.Index(fields=['-created_at', '-id'], name='follower_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='follower',
+            index=models.Index(fields=['owner', '-created_at', '-id'], name='follower_owner_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='follower',
+            index=models.Index(fields=['followed', '-created_at', '-id'], name='follower_followed_created_idx'),
+        ),
+    ]
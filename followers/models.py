@@ -1,5 +1,9 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
 from django.contrib.auth.models import User
+from inspyre_api.cache import invalidate
+from profiles.models import Profile, profile_cache_scopes
 
 
 class Follower(models.Model):
@@ -21,6 +25,83 @@ class Follower(models.Model):
     class Meta:
         ordering = ["-created_at"]
         unique_together = ["owner", "followed"]
+        indexes = [
+            models.Index(
+                fields=["-created_at", "-id"], name="follower_created_id_idx"
+            ),
+            models.Index(
+                fields=["owner", "-created_at", "-id"],
+                name="follower_owner_created_id_idx",
+            ),
+            models.Index(
+                fields=["followed", "-created_at", "-id"],
+                name="follower_followed_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.owner} {self.followed}"
+
+
+class FollowChange(models.Model):
+    """
+    Append-only log of follows ('follow_id' set) and unfollows ('follow_id'
+    empty), written in the same transaction as the change. Each process's
+    follow graph (followers.graph) reads it in id order to apply the
+    changes made by other processes. Users are stored as plain ids, as the
+    log outlives deleted users.
+    """
+    owner_id = models.BigIntegerField()
+    followed_id = models.BigIntegerField()
+    follow_id = models.BigIntegerField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        action = "follow" if self.follow_id else "unfollow"
+        return f"{self.owner_id} {action} {self.followed_id}"
+
+
+def update_follow_counts(instance, delta):
+    """
+    Add 'delta' to the followed user's 'followers_count' and the owner's
+    'following_count', locking the two profiles in owner id order so that
+    concurrent follows between the same users cannot deadlock.
+    """
+    updates = [
+        (instance.followed_id, "followers_count"),
+        (instance.owner_id, "following_count"),
+    ]
+    for owner_id, field in sorted(updates):
+        profiles = Profile.objects.filter(owner_id=owner_id)
+        if delta < 0:
+            profiles = profiles.filter(**{f"{field}__gt": 0})
+        profiles.update(**{field: F(field) + delta})
+
+
+def increment_follow_counts(sender, instance, created, **kwargs):
+    if created:
+        update_follow_counts(instance, 1)
+
+
+def decrement_follow_counts(sender, instance, **kwargs):
+    update_follow_counts(instance, -1)
+
+
+def invalidate_follow_cache(sender, instance, **kwargs):
+    """
+    Only the two profiles and the lists filtered or ordered on their
+    follows change; other lists catch up with the counts within their
+    timeout.
+    """
+    invalidate(
+        "follows",
+        *profile_cache_scopes(instance.owner_id, instance.followed_id),
+        *profile_cache_scopes(instance.owner_id, scope="following"),
+        *profile_cache_scopes(instance.followed_id, scope="followers"),
+    )
+
+
+post_save.connect(increment_follow_counts, sender=Follower)
+post_save.connect(invalidate_follow_cache, sender=Follower)
+post_delete.connect(decrement_follow_counts, sender=Follower)
+post_delete.connect(invalidate_follow_cache, sender=Follower)
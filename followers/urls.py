@@ -4,4 +4,9 @@ from followers import views
 urlpatterns = [
     path("followers/", views.FollowerList.as_view()),
     path("followers/<int:pk>/", views.FollowerDetail.as_view()),
+    path(
+        "followers/relationships/",
+        views.FollowerRelationships.as_view(),
+        name="follower-relationships",
+    ),
 ]
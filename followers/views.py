@@ -1,6 +1,13 @@
-from rest_framework import generics, permissions
+from django.db import transaction
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from django.contrib.auth.models import User
+from django_filters.rest_framework import DjangoFilterBackend
+from inspyre_api.pagination import PageOrKeysetPagination
 from inspyre_api.permissions import IsOwnerOrReadOnly
+from profiles.models import Profile
+from .graph import get_graph
 from .models import Follower
 from .serializers import FollowerSerializer
 
@@ -8,15 +15,22 @@ from .serializers import FollowerSerializer
 class FollowerList(generics.ListCreateAPIView):
     """
     List all followers, i.e. all instances of a user
-    following another user'.
+    following another user', newest first.
+    Filter by 'owner' and/or 'followed' to list one user's followings or
+    followers. Paginated by page number, or by cursor when a 'cursor'
+    parameter is given.
     Create a follower, i.e. follow a user if logged in.
     Perform_create: associate the current logged in user with a follower.
     """
 
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    queryset = Follower.objects.all()
+    queryset = Follower.objects.select_related("owner", "followed")
     serializer_class = FollowerSerializer
+    pagination_class = PageOrKeysetPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ["owner", "followed"]
 
+    @transaction.atomic
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
@@ -29,5 +43,88 @@ class FollowerDetail(generics.RetrieveDestroyAPIView):
     """
 
     permission_classes = [IsOwnerOrReadOnly]
-    queryset = Follower.objects.all()
+    queryset = Follower.objects.select_related("owner", "followed")
     serializer_class = FollowerSerializer
+
+
+class FollowerRelationships(APIView):
+    """
+    API view for the relationship between the user and many others at
+    once, answered from the in-memory follow graph without a query, or
+    with three queries while the graph is still loading.
+
+    - GET: Given 'user_ids' (comma-separated, at most 100), return a
+    'relationships' object mapping each user id to whether the user follows
+    them ('following'), is followed by them ('followed_by') and their
+    follower and following counts.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    max_user_ids = 100
+
+    def get(self, request):
+        try:
+            user_ids = [
+                int(user_id)
+                for user_id in request.query_params.get(
+                    "user_ids", ""
+                ).split(",")
+                if user_id.strip()
+            ]
+        except ValueError:
+            return Response(
+                {"error": "user_ids must be a comma-separated list of ids"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(user_ids) > self.max_user_ids:
+            return Response(
+                {"error": f"At most {self.max_user_ids} user_ids allowed"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        graph = get_graph()
+        if graph is None:
+            relationships = self.query_relationships(request.user, user_ids)
+        else:
+            viewer = request.user.pk
+            relationships = {
+                user_id: {
+                    "following": graph.follows(viewer, user_id),
+                    "followed_by": graph.follows(user_id, viewer),
+                    "followers_count": graph.followers_count(user_id),
+                    "following_count": graph.following_count(user_id),
+                }
+                for user_id in user_ids
+            }
+        return Response({"relationships": relationships})
+
+    def query_relationships(self, user, user_ids):
+        """
+        Read the relationships from the followers table and the profiles'
+        stored counts.
+        """
+        following = set(
+            Follower.objects.filter(
+                owner=user, followed_id__in=user_ids
+            ).values_list("followed_id", flat=True)
+        )
+        followed_by = set(
+            Follower.objects.filter(
+                followed=user, owner_id__in=user_ids
+            ).values_list("owner_id", flat=True)
+        )
+        counts = {
+            owner_id: (followers_count, following_count)
+            for owner_id, followers_count, following_count in (
+                Profile.objects.filter(owner_id__in=user_ids).values_list(
+                    "owner_id", "followers_count", "following_count"
+                )
+            )
+        }
+        return {
+            user_id: {
+                "following": user_id in following,
+                "followed_by": user_id in followed_by,
+                "followers_count": counts.get(user_id, (0, 0))[0],
+                "following_count": counts.get(user_id, (0, 0))[1],
+            }
+            for user_id in user_ids
+        }
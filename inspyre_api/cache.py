@@ -0,0 +1,109 @@
+import time
+from hashlib import md5
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+
+def version_key(scope):
+    return f"version:{scope}"
+
+
+def get_versions(scopes):
+    """
+    Return the current version token of each scope. A token is the time the
+    scope was last invalidated; scopes without one (never invalidated, or
+    evicted from the cache) are given one now.
+    """
+    keys = {version_key(scope): scope for scope in scopes}
+    found = cache.get_many(keys)
+    versions = {keys[key]: token for key, token in found.items()}
+    for key, scope in keys.items():
+        if scope not in versions:
+            cache.add(key, time.time(), None)
+            versions[scope] = cache.get(key)
+    return versions
+
+
+def bump_versions(*scopes):
+    now = time.time()
+    cache.set_many({version_key(scope): now for scope in scopes}, None)
+
+
+def invalidate(*scopes):
+    """
+    Give each scope a new version token once the current transaction
+    commits, so cached responses built from the old data are no longer
+    served as fresh.
+    """
+    transaction.on_commit(lambda: bump_versions(*scopes))
+
+
+class AnonymousCacheMixin:
+    """
+    Cache GET responses of a view for anonymous users.
+
+    Entries are keyed on the host, path and normalized query parameters,
+    and record the version tokens of the view's cache scopes
+    (get_cache_scopes) when they were built. An entry is fresh until one of
+    those scopes is invalidated or RESPONSE_CACHE_TIMEOUT passes.
+
+    Stale entries are revalidated by a single request holding a short lock;
+    concurrent anonymous requests keep receiving the stale entry for up to
+    RESPONSE_CACHE_STALE_TIMEOUT meanwhile instead of all recomputing it.
+    Authenticated requests are never cached, as responses include
+    viewer-specific fields.
+    """
+    cache_scopes = ()
+
+    def get_cache_scopes(self):
+        return self.cache_scopes
+
+    def get_cache_key(self, request):
+        params = sorted(
+            (name, values)
+            for name, values in request.query_params.lists()
+            if any(values)
+        )
+        raw = f"{request.get_host()}{request.path}?"
+        raw += urlencode(params, doseq=True)
+        return f"response:{md5(raw.encode()).hexdigest()}"
+
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+        key = self.get_cache_key(request)
+        versions = get_versions(self.get_cache_scopes())
+        entry = cache.get(key)
+        now = time.time()
+        locked = False
+        if entry is not None:
+            changed = [
+                token
+                for scope, token in versions.items()
+                if entry["versions"].get(scope) != token
+            ]
+            if not changed and now < entry["expires"]:
+                return Response(entry["data"])
+            stale_since = max(changed, default=entry["expires"])
+            max_stale = settings.RESPONSE_CACHE_STALE_TIMEOUT
+            locked = cache.add(f"{key}:lock", True, max_stale)
+            if not locked and now - stale_since < max_stale:
+                return Response(entry["data"])
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(
+                key,
+                {
+                    "data": response.data,
+                    "versions": versions,
+                    "expires": now + settings.RESPONSE_CACHE_TIMEOUT,
+                },
+                settings.RESPONSE_CACHE_TIMEOUT
+                + settings.RESPONSE_CACHE_STALE_TIMEOUT,
+            )
+        if locked:
+            cache.delete(f"{key}:lock")
+        return response
@@ -0,0 +1,79 @@
+from datetime import datetime
+from hashlib import md5
+from django.db.models import Subquery, Value
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def aggregate_subquery(queryset, aggregate):
+    """
+    Return a subquery evaluating 'aggregate' over the whole of 'queryset',
+    which is typically filtered on an OuterRef to the outer row.
+    """
+    return Subquery(
+        queryset.order_by()
+        .annotate(_all=Value(1))
+        .values("_all")
+        .annotate(result=aggregate)
+        .values("result")
+    )
+
+
+def latest(*times):
+    """
+    Return the latest of the given datetimes and version tokens as a
+    timestamp, ignoring missing values.
+    """
+    return max(
+        time.timestamp() if isinstance(time, datetime) else time
+        for time in times
+        if time is not None
+    )
+
+
+class ConditionalGetMixin:
+    """
+    Answer GETs carrying If-None-Match or If-Modified-Since with
+    304 Not Modified before the object is loaded or serialized.
+
+    Views implement get_conditional_state(), returning a tuple of the values
+    the representation depends on (ideally read with a single narrow query)
+    and the timestamp of the last change, or None when the object is missing
+    or hidden from the user so that the request is handled normally. The
+    ETag is weak and also covers the viewer and the negotiated media type.
+    """
+    def get_conditional_state(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        return self.conditional_get(request, super().get, *args, **kwargs)
+
+    def conditional_get(self, request, handler, *args, **kwargs):
+        state = self.get_conditional_state()
+        if state is None:
+            return handler(request, *args, **kwargs)
+        values, last_modified = state
+        digest = md5(
+            repr(
+                (values, request.user.pk, request.accepted_media_type)
+            ).encode()
+        ).hexdigest()
+        headers = {
+            "ETag": f'W/"{digest}"',
+            "Last-Modified": http_date(last_modified),
+        }
+        # Returns the placeholder unless a precondition applies (304/412).
+        conditional = get_conditional_response(
+            request,
+            etag=headers["ETag"],
+            last_modified=int(last_modified),
+            response=HttpResponse(headers=headers),
+        )
+        if conditional.status_code != 200:
+            return conditional
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            for header, value in headers.items():
+                response[header] = value
+        return response
@@ -0,0 +1,167 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as DecodeError
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on a (timestamp, id) pair, newest first.
+
+    Each page is fetched with a range condition on the two ordering fields
+    instead of an OFFSET, and no COUNT(*) is run, so a page costs the same
+    however deep the client scrolls. Querysets should be backed by an index
+    matching 'ordering'.
+
+    Responses contain 'next' (a link carrying an opaque cursor, or None on
+    the last page) and 'results'.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    ordering = ("-created_at", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = self.filter_after(queryset, position)
+        results = list(queryset[:self.page_size + 1])
+        self.next_position = None
+        if len(results) > self.page_size:
+            results = results[:self.page_size]
+            self.next_position = self.get_position(results[-1])
+        return results
+
+    def paginate_positions(self, sources, request):
+        """
+        Paginate over several querysets at once, each given with the
+        (timestamp, id) fields it is keyed on, merging them into a single
+        page. Returns the ids on the page, newest first.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        positions = set()
+        for queryset, fields in sources:
+            queryset = queryset.order_by(*(f"-{field}" for field in fields))
+            if position is not None:
+                queryset = self.filter_after(queryset, position, fields)
+            page = queryset.values_list(*fields)[:self.page_size + 1]
+            positions.update(page)
+        positions = sorted(positions, reverse=True)
+        self.next_position = None
+        if len(positions) > self.page_size:
+            positions = positions[:self.page_size]
+            self.next_position = positions[-1]
+        return [pk for _, pk in positions]
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    @property
+    def position_fields(self):
+        return tuple(field.lstrip("-") for field in self.ordering)
+
+    def get_position(self, instance):
+        return tuple(
+            getattr(instance, field) for field in self.position_fields
+        )
+
+    def filter_after(self, queryset, position, fields=None):
+        """
+        Restrict the queryset to rows ordered after 'position'. The redundant
+        upper bound on the first field lets the database start an index
+        range scan at the cursor.
+        """
+        first, second = fields or self.position_fields
+        value, tiebreak = position
+        return queryset.filter(
+            Q(**{f"{first}__lte": value})
+            & (
+                Q(**{f"{first}__lt": value})
+                | Q(**{f"{second}__lt": tiebreak})
+            )
+        )
+
+    def encode_cursor(self, position):
+        value, tiebreak = position
+        raw = f"{value.isoformat()}|{tiebreak}"
+        return urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = urlsafe_b64decode(encoded.encode()).decode()
+            value, tiebreak = raw.split("|")
+            value = parse_datetime(value)
+            tiebreak = int(tiebreak)
+        except (DecodeError, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return value, tiebreak
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        cursor = self.encode_cursor(self.next_position)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+
+class PageOrKeysetPagination(KeysetPagination):
+    """
+    Page-number pagination for existing list endpoints, with keyset
+    pagination as an opt-in.
+
+    By default responses keep the {count, next, previous, results} shape
+    paginated by '?page=N'. Clients that pass a 'cursor' parameter (empty
+    for the first page) are paginated as by KeysetPagination instead,
+    avoiding the COUNT(*) and OFFSET of deep pages. Both are ordered on
+    'ordering'.
+    """
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param in request.query_params:
+            self.page_pagination = None
+            return super().paginate_queryset(queryset, request, view)
+        self.page_pagination = PageNumberPagination()
+        return self.page_pagination.paginate_queryset(
+            queryset.order_by(*self.ordering), request, view
+        )
+
+    def get_paginated_response(self, data):
+        if self.page_pagination is not None:
+            return self.page_pagination.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return PageNumberPagination().get_paginated_response_schema(schema)
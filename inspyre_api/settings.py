@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 import os
+import warnings
 import dj_database_url
 import cloudinary
 
@@ -27,6 +28,29 @@ cloudinary.config(
 MEDIA_URL = "/media/"
 DEFAULT_FILE_STORAGE = "cloudinary_storage.storage.MediaCloudinaryStorage"
 
+# Set LOCAL_MEDIA to keep uploads on the local filesystem during development.
+if "LOCAL_MEDIA" in os.environ:
+    DEFAULT_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
+    MEDIA_ROOT = os.environ["LOCAL_MEDIA"] or "media"
+
+# Uploads
+# Files are cut off while streaming once they pass MAX_UPLOAD_SIZE, and
+# anything larger than FILE_UPLOAD_MAX_MEMORY_SIZE is spooled to disk rather
+# than held in memory.
+MAX_UPLOAD_SIZE = 2 * 1024 * 1024
+MAX_IMAGE_DIMENSION = 4096
+FILE_UPLOAD_MAX_MEMORY_SIZE = 256 * 1024
+FILE_UPLOAD_HANDLERS = [
+    "inspyre_api.uploads.MaxSizeUploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
+# Resized WebP copies generated for post images: variant name -> max edge (px)
+POST_IMAGE_VARIANTS = {"thumbnail": 320, "medium": 1080}
+POST_IMAGE_VARIANT_QUALITY = 80
+POST_IMAGE_VARIANT_WORKERS = 2
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -102,6 +126,7 @@ INSTALLED_APPS = [
     "direct_messages",
     "followers",
     "likes",
+    "moderation",
     "posts",
     "profiles",
 ]
@@ -214,6 +239,104 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Caching
+# Cache version tokens, cached responses and shared counters must be seen
+# by every worker process, so outside development the cache should be Redis
+# (REDIS_URL) or memcached (MEMCACHED_LOCATION, comma-separated servers).
+# Otherwise CACHE_DIR shares a file-based cache through the filesystem, or
+# each process keeps its own in memory.
+
+if "REDIS_URL" in os.environ:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+elif "MEMCACHED_LOCATION" in os.environ:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+            "LOCATION": os.environ["MEMCACHED_LOCATION"].split(","),
+        }
+    }
+elif "CACHE_DIR" in os.environ:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ["CACHE_DIR"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+if "DEV" not in os.environ and not (
+    "REDIS_URL" in os.environ or "MEMCACHED_LOCATION" in os.environ
+):
+    warnings.warn(
+        "Neither REDIS_URL nor MEMCACHED_LOCATION is set, so cache "
+        "invalidations and shared counters are not seen by all worker "
+        "processes."
+    )
+
+# Anonymous responses stay fresh until the data behind them changes or the
+# timeout passes, and may be served stale for a few more seconds while one
+# request rebuilds them.
+RESPONSE_CACHE_TIMEOUT = 300
+RESPONSE_CACHE_STALE_TIMEOUT = 30
+
+# Trending posts
+# Windows map a name accepted by /posts/trending/?window= to its length in
+# hours. Scores are refreshed by `python manage.py refresh_trending`.
+
+TRENDING_WINDOWS = {"24h": 24, "7d": 24 * 7}
+TRENDING_DEFAULT_WINDOW = "7d"
+TRENDING_CACHE_TIMEOUT = 300
+
+# Like counters
+# Set LIKE_COUNTER_BUFFER to a buffer class to accumulate like/unlike deltas
+# and apply them to posts every LIKE_COUNTER_FLUSH_INTERVAL seconds, instead
+# of updating the post row on every like. likes.buffer.LocalBuffer keeps
+# them per process; likes.buffer.CacheBuffer shares them through a cache
+# with atomic increments (e.g. Redis).
+
+LIKE_COUNTER_BUFFER = os.environ.get("LIKE_COUNTER_BUFFER")
+LIKE_COUNTER_FLUSH_INTERVAL = 2
+
+# Follow graph
+# Each process keeps an in-memory index of follow relationships
+# (followers.graph). At most every FOLLOW_GRAPH_CHECK_INTERVAL seconds it
+# applies the follows and unfollows logged by all processes since, and it
+# folds them into its arrays once more than FOLLOW_GRAPH_COMPACT_THRESHOLD
+# are pending. Gaps in the log are waited for FOLLOW_GRAPH_LOG_GRACE
+# seconds (the longest expected transaction), and log entries are kept for
+# FOLLOW_GRAPH_LOG_RETENTION seconds.
+
+FOLLOW_GRAPH_CHECK_INTERVAL = 1
+FOLLOW_GRAPH_COMPACT_THRESHOLD = 10000
+FOLLOW_GRAPH_LOG_GRACE = 60
+FOLLOW_GRAPH_LOG_RETENTION = 24 * 60 * 60
+
+# Username autocomplete
+# The DM composer's user search returns at most USERNAME_AUTOCOMPLETE_LIMIT
+# ranked matches, cached per search term for
+# USERNAME_AUTOCOMPLETE_CACHE_TIMEOUT seconds.
+
+USERNAME_AUTOCOMPLETE_LIMIT = 10
+USERNAME_AUTOCOMPLETE_CACHE_TIMEOUT = 30
+
+# Home timelines
+# Posts are copied into followers' timelines when created, unless their
+# owner has more followers than the threshold, in which case they are merged
+# in when timelines are read. New follows backfill the most recent posts.
+
+TIMELINE_FANOUT_THRESHOLD = 5000
+TIMELINE_BACKFILL_SIZE = 200
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
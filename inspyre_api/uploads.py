@@ -0,0 +1,85 @@
+from io import BytesIO
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from PIL import Image
+from rest_framework import serializers
+
+
+class OversizedUpload(UploadedFile):
+    """
+    Placeholder for a file that was cut off while streaming because it
+    exceeded settings.MAX_UPLOAD_SIZE. It carries the size received so far
+    but no content, so serializers can reject it with a field error.
+    """
+    def __init__(self, name, content_type, size, charset=None):
+        super().__init__(BytesIO(), name, content_type, size, charset)
+
+
+class MaxSizeUploadHandler(FileUploadHandler):
+    """
+    Upload handler that stops buffering a file as soon as it streams past
+    settings.MAX_UPLOAD_SIZE. Later handlers receive no further chunks and
+    the file is replaced by an OversizedUpload, so an oversized upload never
+    occupies more than the limit in memory or on disk.
+
+    Must be listed first in FILE_UPLOAD_HANDLERS.
+    """
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.MAX_UPLOAD_SIZE:
+            return None
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self.received > settings.MAX_UPLOAD_SIZE:
+            return OversizedUpload(
+                self.file_name, self.content_type, self.received, self.charset
+            )
+        return None
+
+
+def read_image_header(file):
+    """
+    Return the (width, height) of an uploaded image, parsed from its header
+    without decoding the pixel data.
+    """
+    file.seek(0)
+    try:
+        with Image.open(file) as image:
+            return image.size
+    finally:
+        file.seek(0)
+
+
+class UploadedImageField(serializers.ImageField):
+    """
+    ImageField for uploads that checks the size limit first, then reads the
+    dimensions from the image header alone instead of having Django open and
+    verify the whole image.
+    """
+    default_error_messages = {
+        "too_large": "Image size larger than {max_mb}MB!",
+        "too_tall": "Image height larger than {max_dimension}px!",
+        "too_wide": "Image width larger than {max_dimension}px!",
+    }
+
+    def to_internal_value(self, data):
+        file = serializers.FileField.to_internal_value(self, data)
+        max_size = settings.MAX_UPLOAD_SIZE
+        max_dimension = settings.MAX_IMAGE_DIMENSION
+        if file.size > max_size:
+            self.fail("too_large", max_mb=max_size // (1024 * 1024))
+        try:
+            width, height = read_image_header(file)
+        except (OSError, SyntaxError, Image.DecompressionBombError):
+            self.fail("invalid_image")
+        if height > max_dimension:
+            self.fail("too_tall", max_dimension=max_dimension)
+        if width > max_dimension:
+            self.fail("too_wide", max_dimension=max_dimension)
+        return file
@@ -31,6 +31,7 @@ urlpatterns = [
     path("", include("direct_messages.urls")),
     path("", include("followers.urls")),
     path("", include("likes.urls")),
+    path("", include("moderation.urls")),
     path("", include("posts.urls")),
     path("", include("profiles.urls")),
 ]
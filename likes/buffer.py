@@ -0,0 +1,228 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils.module_loading import import_string
+from posts.models import Post
+
+logger = logging.getLogger(__name__)
+
+
+class LocalBuffer:
+    """
+    In-process buffer of like count deltas, keyed by post id.
+    """
+    def __init__(self):
+        self._deltas = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, post_id, delta):
+        with self._lock:
+            self._deltas[post_id] += delta
+
+    def pending(self, post_ids):
+        with self._lock:
+            return {pk: self._deltas.get(pk, 0) for pk in post_ids}
+
+    def drain(self):
+        """
+        Remove and return the accumulated non-zero deltas.
+        """
+        with self._lock:
+            deltas, self._deltas = self._deltas, Counter()
+        return {pk: delta for pk, delta in deltas.items() if delta}
+
+
+class CacheBuffer:
+    """
+    Buffer of like count deltas shared between processes through a Django
+    cache. Requires a backend whose incr/decr are atomic across processes,
+    such as Redis or Memcached.
+
+    Each post keeps two counter keys, its buffered likes and its buffered
+    unlikes, which are only ever incremented or decremented by what was
+    read, so they never go negative (memcached's decr stops at 0). The
+    post's delta is their difference. The first delta since a flush also
+    marks the post dirty and appends it to a registry under a short lock,
+    so hot posts only pay for the increment.
+    """
+    prefix = "like_buffer"
+
+    def __init__(self, alias="default"):
+        self.cache = caches[alias]
+
+    def count_keys(self, post_id):
+        """
+        Return the keys of the post's buffered likes and unlikes.
+        """
+        return (
+            f"{self.prefix}:likes:{post_id}",
+            f"{self.prefix}:unlikes:{post_id}",
+        )
+
+    def dirty_key(self, post_id):
+        return f"{self.prefix}:dirty:{post_id}"
+
+    @contextmanager
+    def registry_lock(self):
+        key = f"{self.prefix}:lock"
+        while not self.cache.add(key, True, 5):
+            time.sleep(0.005)
+        try:
+            yield
+        finally:
+            self.cache.delete(key)
+
+    def add(self, post_id, delta):
+        likes_key, unlikes_key = self.count_keys(post_id)
+        key = likes_key if delta > 0 else unlikes_key
+        self.cache.add(key, 0, None)
+        try:
+            self.cache.incr(key, abs(delta))
+        except ValueError:
+            # Evicted between add() and incr().
+            self.cache.set(key, abs(delta), None)
+        if self.cache.add(self.dirty_key(post_id), True, None):
+            with self.registry_lock():
+                registry = f"{self.prefix}:registry"
+                post_ids = self.cache.get(registry, [])
+                post_ids.append(post_id)
+                self.cache.set(registry, post_ids, None)
+
+    def pending(self, post_ids):
+        keys = {pk: self.count_keys(pk) for pk in post_ids}
+        found = self.cache.get_many(
+            [key for pair in keys.values() for key in pair]
+        )
+        return {
+            pk: found.get(likes_key, 0) - found.get(unlikes_key, 0)
+            for pk, (likes_key, unlikes_key) in keys.items()
+        }
+
+    def drain(self):
+        """
+        Remove and return the accumulated non-zero deltas. Dirty markers are
+        cleared before the deltas are read, so a delta added meanwhile is
+        either drained now or registers its post for the next drain.
+        """
+        registry = f"{self.prefix}:registry"
+        with self.registry_lock():
+            post_ids = self.cache.get(registry, [])
+            self.cache.delete(registry)
+        deltas = {}
+        for post_id in post_ids:
+            self.cache.delete(self.dirty_key(post_id))
+            delta = 0
+            for key, sign in zip(self.count_keys(post_id), (1, -1)):
+                count = self.cache.get(key, 0)
+                if count:
+                    self.cache.decr(key, count)
+                    delta += sign * count
+            if delta:
+                deltas[post_id] = delta
+        return deltas
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+_flusher = None
+
+
+def get_buffer():
+    """
+    Return the buffer configured by settings.LIKE_COUNTER_BUFFER, or None
+    when like counters are written through.
+    """
+    global _buffer
+    if _buffer is None and settings.LIKE_COUNTER_BUFFER:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = import_string(settings.LIKE_COUNTER_BUFFER)()
+    return _buffer
+
+
+def set_buffer(buffer):
+    """
+    Replace the buffer in use, e.g. for benchmarks. None restores the
+    configured behaviour.
+    """
+    global _buffer
+    _buffer = buffer
+
+
+def buffer_delta(post_id, delta):
+    """
+    Add a like count delta for the post to the buffer once the current
+    transaction commits, making sure the flusher is running.
+    """
+    buffer = get_buffer()
+    transaction.on_commit(lambda: buffer.add(post_id, delta))
+    _start_flusher()
+
+
+def pending_likes(post_ids):
+    """
+    Return the buffered like count delta of each post, to be added to its
+    stored 'likes_count'.
+    """
+    buffer = get_buffer()
+    if buffer is None:
+        return {pk: 0 for pk in post_ids}
+    return buffer.pending(post_ids)
+
+
+def flush():
+    """
+    Apply the buffered deltas to the stored counters with one
+    UPDATE ... SET likes_count = likes_count + n per post. Deltas are put
+    back if the update fails. Returns the number of posts updated.
+    """
+    buffer = get_buffer()
+    if buffer is None:
+        return 0
+    deltas = buffer.drain()
+    try:
+        with transaction.atomic():
+            for post_id, delta in sorted(deltas.items()):
+                Post.objects.filter(pk=post_id).update(
+                    likes_count=Greatest(F("likes_count") + delta, 0)
+                )
+    except Exception:
+        for post_id, delta in deltas.items():
+            buffer.add(post_id, delta)
+        raise
+    return len(deltas)
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(settings.LIKE_COUNTER_FLUSH_INTERVAL)
+        try:
+            flush()
+        except Exception:
+            logger.exception("Flushing like counters failed")
+        finally:
+            # The flusher thread holds its own connections; release them.
+            connections.close_all()
+
+
+def _start_flusher():
+    global _flusher
+    if _flusher is not None:
+        return
+    with _buffer_lock:
+        if _flusher is None:
+            _flusher = threading.Thread(
+                target=_flush_periodically,
+                name="like-counter-flusher",
+                daemon=True,
+            )
+            _flusher.start()
+            atexit.register(flush)
@@ -0,0 +1,96 @@
+import threading
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test.utils import override_settings
+from likes.buffer import LocalBuffer, flush, set_buffer
+from likes.models import Like
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    """
+    Management command that measures like throughput on a single hot post,
+    with the like counter written through on every like and with deltas
+    buffered and flushed in the background. Creates and removes its own
+    post and users; do not run against a production database.
+    """
+    help = "Benchmark direct versus buffered like counter updates."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--likes",
+            type=int,
+            default=500,
+            help="Number of likes created per mode.",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=8,
+            help="Number of concurrent threads creating likes.",
+        )
+
+    def handle(self, *args, **options):
+        likes, threads = options["likes"], options["threads"]
+        stamp = int(time.time())
+        User.objects.bulk_create(
+            User(username=f"like-bench-{stamp}-{i}") for i in range(likes)
+        )
+        users = list(
+            User.objects.filter(username__startswith=f"like-bench-{stamp}-")
+        )
+        modes = (("direct", None), ("buffered", LocalBuffer()))
+        try:
+            # set_buffer(None) must mean write-through here, whatever the
+            # configured buffer is.
+            with override_settings(LIKE_COUNTER_BUFFER=None):
+                for mode, buffer in modes:
+                    set_buffer(buffer)
+                    self.benchmark(mode, users, threads)
+        finally:
+            set_buffer(None)
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def benchmark(self, mode, users, threads):
+        """
+        Like a new post once per user, flush, and report the throughput and
+        the resulting stored counter.
+        """
+        post = Post.objects.create(
+            owner=users[0], title=f"Like benchmark ({mode})"
+        )
+        try:
+            elapsed = self.run(post, users, threads)
+            flush()
+            post.refresh_from_db()
+            self.stdout.write(
+                f"{mode}: {len(users) / elapsed:.0f} likes/s, "
+                f"likes_count={post.likes_count}"
+            )
+        finally:
+            post.delete()
+
+    def run(self, post, users, threads):
+        """
+        Create one like on the post per user from 'threads' threads and
+        return the elapsed time in seconds.
+        """
+        def work(chunk):
+            try:
+                for user in chunk:
+                    Like.objects.create(owner=user, post=post)
+            finally:
+                connections.close_all()
+
+        workers = [
+            threading.Thread(target=work, args=(users[i::threads],))
+            for i in range(threads)
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return time.perf_counter() - started
@@ -1,6 +1,11 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
 from django.contrib.auth.models import User
+from inspyre_api.cache import invalidate
 from posts.models import Post
+from profiles.models import profile_cache_scopes
+from .buffer import buffer_delta, get_buffer
 
 
 class Like(models.Model):
@@ -18,6 +23,55 @@ class Like(models.Model):
     class Meta:
         ordering = ['-created_at']
         unique_together = ['owner', 'post']
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'], name='like_created_id_idx'
+            ),
+            models.Index(
+                fields=['post', '-created_at', '-id'],
+                name='like_post_created_id_idx',
+            ),
+            models.Index(
+                fields=['owner', '-created_at', '-id'],
+                name='like_owner_created_id_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.owner} {self.post}'
+
+
+def increment_likes_count(sender, instance, created, **kwargs):
+    if created and get_buffer() is not None:
+        buffer_delta(instance.post_id, 1)
+    elif created:
+        Post.objects.filter(pk=instance.post_id).update(
+            likes_count=F('likes_count') + 1
+        )
+
+
+def decrement_likes_count(sender, instance, **kwargs):
+    if get_buffer() is not None:
+        buffer_delta(instance.post_id, -1)
+        return
+    Post.objects.filter(pk=instance.post_id, likes_count__gt=0).update(
+        likes_count=F('likes_count') - 1
+    )
+
+
+def invalidate_like_cache(sender, instance, **kwargs):
+    """
+    Only the liked post and the post lists filtered or ordered on likes
+    change; other lists catch up with the count within their timeout.
+    """
+    invalidate(
+        'likes',
+        f'post:{instance.post_id}',
+        *profile_cache_scopes(instance.owner_id, scope='likes'),
+    )
+
+
+post_save.connect(increment_likes_count, sender=Like)
+post_save.connect(invalidate_like_cache, sender=Like)
+post_delete.connect(decrement_likes_count, sender=Like)
+post_delete.connect(invalidate_like_cache, sender=Like)
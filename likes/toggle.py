@@ -0,0 +1,84 @@
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from posts.models import Post
+from .models import Like
+
+
+def add_like(user, post_id):
+    """
+    Make 'user' like the post, doing nothing if they already do. Returns the
+    id of the like, or None if the post does not exist.
+
+    The like is written with INSERT ... ON CONFLICT DO NOTHING RETURNING, so
+    a repeated like costs neither a failed insert nor a rollback, and
+    post_save is sent only when a row was actually inserted.
+    """
+    if not connection.features.can_return_columns_from_insert:
+        return _add_like_fallback(user, post_id)
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {Like._meta.db_table} "
+                "(owner_id, post_id, created_at) "
+                f"SELECT %s, id, %s FROM {Post._meta.db_table} WHERE id = %s "
+                "ON CONFLICT (owner_id, post_id) DO NOTHING RETURNING id",
+                [user.pk, now, post_id],
+            )
+            row = cursor.fetchone()
+        if row is None:
+            return (
+                Like.objects.filter(owner=user, post_id=post_id)
+                .values_list("id", flat=True)
+                .first()
+            )
+        like = Like(pk=row[0], owner=user, post_id=post_id)
+        post_save.send(
+            sender=Like,
+            instance=like,
+            created=True,
+            update_fields=None,
+            raw=False,
+            using=connection.alias,
+        )
+    return like.pk
+
+
+def _add_like_fallback(user, post_id):
+    with transaction.atomic():
+        if not Post.objects.filter(pk=post_id).exists():
+            return None
+        like, _ = Like.objects.get_or_create(owner=user, post_id=post_id)
+    return like.pk
+
+
+def remove_like(user, post_id):
+    """
+    Remove the user's like from the post, if any, with a single
+    DELETE ... RETURNING. post_delete is sent only when a like was removed.
+    Returns whether one was.
+    """
+    if not connection.features.can_return_columns_from_insert:
+        with transaction.atomic():
+            deleted, _ = Like.objects.filter(
+                owner=user, post_id=post_id
+            ).delete()
+        return bool(deleted)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {Like._meta.db_table} "
+                "WHERE owner_id = %s AND post_id = %s RETURNING id",
+                [user.pk, post_id],
+            )
+            row = cursor.fetchone()
+        if row is None:
+            return False
+        post_delete.send(
+            sender=Like,
+            instance=Like(pk=row[0], owner=user, post_id=post_id),
+            using=connection.alias,
+            origin=None,
+        )
+    return True
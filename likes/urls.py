@@ -4,4 +4,6 @@ from likes import views
 urlpatterns = [
     path("likes/", views.LikeList.as_view()),
     path("likes/<int:pk>/", views.LikeDetail.as_view()),
+    path("likes/lookup/", views.LikeLookup.as_view(), name="like-lookup"),
+    path("posts/<int:pk>/like/", views.PostLike.as_view(), name="post-like"),
 ]
@@ -1,20 +1,34 @@
-from rest_framework import generics, permissions
+from django.db import transaction
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django_filters.rest_framework import DjangoFilterBackend
+from inspyre_api.pagination import PageOrKeysetPagination
 from inspyre_api.permissions import IsOwnerOrReadOnly
+from likes.buffer import pending_likes
 from likes.models import Like
 from likes.serializers import LikeSerializer
+from likes.toggle import add_like, remove_like
+from posts.models import Post
 
 
 class LikeList(generics.ListCreateAPIView):
     """
     API view for listing likes or creating a new like.
 
-    - GET: Retrieve a list of likes.
+    - GET: Retrieve a list of likes, newest first, optionally filtered by
+      'post' and 'owner'. Paginated by page number, or by cursor when a
+      'cursor' parameter is given.
     - POST: Create a new like if the user is authenticated.
     """
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     serializer_class = LikeSerializer
-    queryset = Like.objects.all()
+    queryset = Like.objects.select_related("owner")
+    pagination_class = PageOrKeysetPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ["post", "owner"]
 
+    @transaction.atomic
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
@@ -28,4 +42,83 @@ class LikeDetail(generics.RetrieveDestroyAPIView):
     """
     permission_classes = [IsOwnerOrReadOnly]
     serializer_class = LikeSerializer
-    queryset = Like.objects.all()
+    queryset = Like.objects.select_related("owner")
+
+
+class PostLike(APIView):
+    """
+    API view for liking and unliking a post idempotently.
+
+    - PUT: Like the post. Repeating the request leaves a single like.
+    - DELETE: Remove the user's like from the post, if any.
+
+    Both respond with the user's 'like_id' (None once unliked) and the
+    post's 'likes_count'.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def put(self, request, pk):
+        like_id = add_like(request.user, pk)
+        if like_id is None:
+            return self.not_found()
+        return self.state_response(pk, like_id)
+
+    def delete(self, request, pk):
+        remove_like(request.user, pk)
+        return self.state_response(pk, None)
+
+    def state_response(self, pk, like_id):
+        likes_count = (
+            Post.objects.filter(pk=pk)
+            .values_list("likes_count", flat=True)
+            .first()
+        )
+        if likes_count is None:
+            return self.not_found()
+        likes_count += pending_likes([pk])[pk]
+        return Response({"like_id": like_id, "likes_count": likes_count})
+
+    def not_found(self):
+        return Response(
+            {"error": "Post not found"}, status=status.HTTP_404_NOT_FOUND
+        )
+
+
+class LikeLookup(APIView):
+    """
+    API view for refreshing the like state of many posts at once.
+
+    - GET: Given 'post_ids' (comma-separated, at most 100), return a 'likes'
+    object mapping each post id to the user's like id, or None where they
+    have not liked it, read with a single query.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    max_post_ids = 100
+
+    def get(self, request):
+        try:
+            post_ids = [
+                int(post_id)
+                for post_id in request.query_params.get(
+                    "post_ids", ""
+                ).split(",")
+                if post_id.strip()
+            ]
+        except ValueError:
+            return Response(
+                {"error": "post_ids must be a comma-separated list of ids"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(post_ids) > self.max_post_ids:
+            return Response(
+                {"error": f"At most {self.max_post_ids} post_ids allowed"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        likes = dict(
+            Like.objects.filter(
+                owner=request.user, post_id__in=post_ids
+            ).values_list("post_id", "id")
+        )
+        return Response(
+            {"likes": {post_id: likes.get(post_id) for post_id in post_ids}}
+        )
@@ -0,0 +1,34 @@
+from django.db import transaction
+from django.utils import timezone
+from inspyre_api.cache import invalidate
+from .models import Report, content_cache_scopes
+
+
+def approve(model, ids):
+    """
+    Approve the reported posts or comments of 'model' with the given ids and
+    delete their reports, one UPDATE and one DELETE for the whole batch.
+    Returns the number approved.
+    """
+    field = model._meta.model_name
+    with transaction.atomic():
+        reported = model.objects.filter(pk__in=ids, approval_status=1)
+        invalidate(*content_cache_scopes(reported))
+        approved = reported.update(
+            approval_status=0, updated_at=timezone.now()
+        )
+        Report.objects.filter(**{f"{field}__in": ids}).delete()
+    return approved
+
+
+def remove(model, ids):
+    """
+    Delete the reported posts or comments of 'model' with the given ids,
+    along with their reports and everything depending on them. Returns the
+    number removed.
+    """
+    with transaction.atomic():
+        _, deleted = model.objects.filter(
+            pk__in=ids, approval_status=1
+        ).delete()
+    return deleted.get(model._meta.label, 0)
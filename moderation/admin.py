@@ -0,0 +1,13 @@
+from django.contrib import admin
+from .models import Report
+
+
+@admin.register(Report)
+class ReportAdmin(admin.ModelAdmin):
+    """
+    Admin queue of reported posts and comments, most reported first.
+    """
+    list_display = ["__str__", "reports_count", "created_at", "updated_at"]
+    list_select_related = ["post", "comment"]
+    ordering = ["-reports_count", "-updated_at"]
+    raw_id_fields = ["post", "comment"]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.20 on 2026-10-18 07:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_existing_reports(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('comments', 'Comment')
+    Report = apps.get_model('moderation', 'Report')
+    Report.objects.bulk_create(
+        [
+            Report(post_id=pk, reports_count=1)
+            for pk in Post.objects.filter(approval_status=1).values_list(
+                'pk', flat=True
+            )
+        ]
+        + [
+            Report(comment_id=pk, reports_count=1)
+            for pk in Comment.objects.filter(approval_status=1).values_list(
+                'pk', flat=True
+            )
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('posts', '0010_post_post_reported_idx'),
+        ('comments', '0005_comment_comment_reported_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Report',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reports_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('comment', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='report', to='comments.comment')),
+                ('post', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='report', to='posts.post')),
+            ],
+            options={
+                'ordering': ['-updated_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='report',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('comment__isnull', True), ('post__isnull', False)), models.Q(('comment__isnull', False), ('post__isnull', True)), _connector='OR'), name='report_single_target'),
+        ),
+        migrations.RunPython(
+            create_existing_reports, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,92 @@
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from comments.models import Comment
+from inspyre_api.cache import invalidate
+from posts.models import Post
+
+
+def content_cache_scopes(queryset):
+    """
+    Return the response cache scopes of a queryset of posts or comments.
+    """
+    if queryset.model is Comment:
+        post_ids = set(queryset.values_list("post_id", flat=True))
+        return ["comments", *(f"post_comments:{pk}" for pk in post_ids)]
+    post_ids = queryset.values_list("pk", flat=True)
+    return ["posts", *(f"post:{pk}" for pk in post_ids)]
+
+
+class ReportQuerySet(models.QuerySet):
+    """
+    QuerySet for the Report model.
+    """
+    def record(self, target):
+        """
+        Count a report against a post or comment, creating its report row on
+        the first report, and mark the target as reported. Only the status
+        and timestamp columns are written, so concurrent edits are kept and
+        the save signals (search index, caches) are not fired.
+        """
+        field = "post" if isinstance(target, Post) else "comment"
+        with transaction.atomic():
+            if not self._increment(field, target):
+                try:
+                    with transaction.atomic():
+                        self.create(reports_count=1, **{field: target})
+                except IntegrityError:
+                    # Created concurrently by another report.
+                    self._increment(field, target)
+            reported = type(target).objects.filter(pk=target.pk)
+            if reported.exclude(approval_status=1).update(
+                approval_status=1, updated_at=timezone.now()
+            ):
+                target.approval_status = 1
+                invalidate(*content_cache_scopes(reported))
+
+    def _increment(self, field, target):
+        return self.filter(**{field: target}).update(
+            reports_count=F("reports_count") + 1, updated_at=timezone.now()
+        )
+
+
+class Report(models.Model):
+    """
+    Aggregated reports against a post or a comment: one row per reported
+    object, counting how many times it has been reported. The row is
+    removed when the content is approved or deleted.
+    """
+    post = models.OneToOneField(
+        Post,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="report",
+    )
+    comment = models.OneToOneField(
+        Comment,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="report",
+    )
+    reports_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ReportQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-updated_at"]
+        constraints = [
+            models.CheckConstraint(
+                check=Q(post__isnull=False, comment__isnull=True)
+                | Q(post__isnull=True, comment__isnull=False),
+                name="report_single_target",
+            ),
+        ]
+
+    def __str__(self):
+        if self.post_id:
+            return f"Post {self.post_id}"
+        return f"Comment {self.comment_id}"
@@ -0,0 +1,46 @@
+from rest_framework import serializers
+from comments.serializers import CommentNodeSerializer
+from posts.serializers import PostSerializer
+
+
+class ReportedPostSerializer(PostSerializer):
+    """
+    Serializer for a post in the moderation queue, adding how many times it
+    has been reported and when it was last reported.
+    """
+    reports_count = serializers.ReadOnlyField(source="report.reports_count")
+    last_reported_at = serializers.ReadOnlyField(source="report.updated_at")
+
+    class Meta(PostSerializer.Meta):
+        fields = PostSerializer.Meta.fields + [
+            "approval_status",
+            "reports_count",
+            "last_reported_at",
+        ]
+
+
+class ReportedCommentSerializer(CommentNodeSerializer):
+    """
+    Serializer for a comment in the moderation queue, adding how many times
+    it has been reported and when it was last reported.
+    """
+    reports_count = serializers.ReadOnlyField(source="report.reports_count")
+    last_reported_at = serializers.ReadOnlyField(source="report.updated_at")
+
+    class Meta(CommentNodeSerializer.Meta):
+        fields = CommentNodeSerializer.Meta.fields + [
+            "reports_count",
+            "last_reported_at",
+        ]
+
+
+class BulkModerationSerializer(serializers.Serializer):
+    """
+    Serializer for the ids of the posts or comments a bulk moderation
+    action applies to.
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=500,
+    )
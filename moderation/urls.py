@@ -0,0 +1,39 @@
+from django.urls import path
+from comments.models import Comment
+from moderation import views
+from posts.models import Post
+
+urlpatterns = [
+    # Posts
+    path(
+        "moderation/posts/",
+        views.ReportedPostList.as_view(),
+        name="moderation-posts",
+    ),
+    path(
+        "moderation/posts/approve/",
+        views.BulkApprove.as_view(model=Post),
+        name="moderation-posts-approve",
+    ),
+    path(
+        "moderation/posts/remove/",
+        views.BulkRemove.as_view(model=Post),
+        name="moderation-posts-remove",
+    ),
+    # Comments
+    path(
+        "moderation/comments/",
+        views.ReportedCommentList.as_view(),
+        name="moderation-comments",
+    ),
+    path(
+        "moderation/comments/approve/",
+        views.BulkApprove.as_view(model=Comment),
+        name="moderation-comments-approve",
+    ),
+    path(
+        "moderation/comments/remove/",
+        views.BulkRemove.as_view(model=Comment),
+        name="moderation-comments-remove",
+    ),
+]
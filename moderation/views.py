@@ -0,0 +1,84 @@
+from rest_framework import generics, permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from comments.models import Comment
+from comments.threads import with_thread_state
+from inspyre_api.pagination import KeysetPagination
+from posts.models import Post
+from .actions import approve, remove
+from .serializers import (
+    BulkModerationSerializer,
+    ReportedCommentSerializer,
+    ReportedPostSerializer,
+)
+
+
+class ReportedPostList(generics.ListAPIView):
+    """
+    API view for the moderation queue of reported posts (admin only).
+
+    - GET: Retrieve reported posts newest first with their report counts,
+    paginated by an opaque 'cursor'.
+    """
+    serializer_class = ReportedPostSerializer
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        return (
+            Post.objects.filter(approval_status=1)
+            .with_related()
+            .with_viewer_state(self.request.user)
+            .select_related("report")
+        )
+
+
+class ReportedCommentList(generics.ListAPIView):
+    """
+    API view for the moderation queue of reported comments (admin only).
+
+    - GET: Retrieve reported comments newest first with their report
+    counts, paginated by an opaque 'cursor'.
+    """
+    serializer_class = ReportedCommentSerializer
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        return with_thread_state(
+            Comment.objects.filter(approval_status=1)
+        ).select_related("report")
+
+
+class BulkApprove(APIView):
+    """
+    API view for approving reported content in bulk (admin only).
+
+    - POST: Approve the reported posts or comments (per 'model') whose ids
+    are given in 'ids' and clear their reports.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    model = None
+
+    def post(self, request):
+        serializer = BulkModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        approved = approve(self.model, serializer.validated_data["ids"])
+        return Response({"approved": approved})
+
+
+class BulkRemove(APIView):
+    """
+    API view for removing reported content in bulk (admin only).
+
+    - POST: Delete the reported posts or comments (per 'model') whose ids
+    are given in 'ids'.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    model = None
+
+    def post(self, request):
+        serializer = BulkModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        removed = remove(self.model, serializer.validated_data["ids"])
+        return Response({"removed": removed})
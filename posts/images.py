@@ -0,0 +1,92 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+from inspyre_api.cache import invalidate
+from .models import Post
+
+logger = logging.getLogger(__name__)
+_executor = ThreadPoolExecutor(
+    max_workers=settings.POST_IMAGE_VARIANT_WORKERS,
+    thread_name_prefix="image-variants",
+)
+
+
+def variant_name(post, variant):
+    return f"images/variants/{post.pk}/{variant}.webp"
+
+
+def render_variants(image_file):
+    """
+    Return a dict mapping each variant in settings.POST_IMAGE_VARIANTS to
+    WebP bytes of the image resized to fit within its maximum edge.
+    """
+    sizes = settings.POST_IMAGE_VARIANTS
+    with Image.open(image_file) as image:
+        # Let JPEG decode at a reduced scale when the largest variant allows.
+        largest = max(sizes.values())
+        image.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert(
+                "RGBA" if "transparency" in image.info else "RGB"
+            )
+        rendered = {}
+        for variant, size in sizes.items():
+            resized = image.copy()
+            resized.thumbnail((size, size))
+            output = BytesIO()
+            resized.save(
+                output,
+                "WEBP",
+                quality=settings.POST_IMAGE_VARIANT_QUALITY,
+            )
+            rendered[variant] = output.getvalue()
+    return rendered
+
+
+def generate_variants(post_id):
+    """
+    Produce the resized WebP variants of a post's image in its storage and
+    record their names in 'image_variants', replacing any previous set.
+    """
+    try:
+        post = Post.objects.get(pk=post_id)
+    except Post.DoesNotExist:
+        return
+    storage = post.image.storage
+    for name in post.image_variants.values():
+        storage.delete(name)
+    variants = {}
+    if post.image:
+        with post.image.open("rb") as image_file:
+            rendered = render_variants(image_file)
+        for variant, content in rendered.items():
+            variants[variant] = storage.save(
+                variant_name(post, variant), ContentFile(content)
+            )
+    Post.objects.filter(pk=post_id).update(image_variants=variants)
+    invalidate("posts", f"post:{post_id}")
+
+
+def _generate_in_background(post_id):
+    try:
+        generate_variants(post_id)
+    except Exception:
+        logger.exception("Image variants failed for post %s", post_id)
+    finally:
+        # Worker threads hold their own connections; release them.
+        connections.close_all()
+
+
+def schedule_variants(post):
+    """
+    Generate a post's image variants on a worker thread once the current
+    transaction commits, keeping the resize off the request thread.
+    """
+    transaction.on_commit(
+        lambda: _executor.submit(_generate_in_background, post.pk)
+    )
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from posts.models import Post, TimelineEntry
+
+
+class Command(BaseCommand):
+    """
+    Management command that copies posts which have not been fanned out yet
+    (e.g. posts created before home timelines existed) into their followers'
+    timelines. Posts whose owners exceed the fan-out threshold are left to
+    be merged in when timelines are read.
+    """
+    help = "Fan out posts that are not yet in their followers' timelines."
+
+    def handle(self, *args, **options):
+        fanned_out = skipped = 0
+        posts = Post.objects.filter(fanned_out=False).order_by("-created_at")
+        for post in posts.iterator():
+            with transaction.atomic():
+                if TimelineEntry.objects.fan_out(post):
+                    fanned_out += 1
+                else:
+                    skipped += 1
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Fanned out {fanned_out} post(s); {skipped} left to be "
+                "read on demand."
+            )
+        )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from posts.images import generate_variants
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    """
+    Management command that generates the resized WebP variants of post
+    images, e.g. for posts uploaded before variants existed.
+    """
+    help = "Generate resized WebP variants of post images."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Regenerate variants for every post with an image, not only "
+            "those missing them.",
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image="")
+        if not options["all"]:
+            posts = posts.filter(image_variants={})
+        generated = 0
+        for post_id in posts.values_list("id", flat=True).iterator():
+            generate_variants(post_id)
+            generated += 1
+        self.stdout.write(
+            self.style.SUCCESS(f"Generated variants for {generated} post(s).")
+        )
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from posts import search
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    """
+    Management command that recomputes every post's search document (e.g.
+    after usernames change) and rebuilds the full-text index.
+    """
+    help = "Recompute post search documents and rebuild the search index."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of posts recomputed per query.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        posts = Post.objects.select_related("owner").prefetch_related(
+            "post_tags"
+        )
+        changed = []
+        updated = 0
+        with transaction.atomic():
+            for post in posts.iterator(chunk_size=batch_size):
+                document = post.build_search_document()
+                if document != post.search_document:
+                    post.search_document = document
+                    changed.append(post)
+                if len(changed) >= batch_size:
+                    Post.objects.bulk_update(changed, ["search_document"])
+                    updated += len(changed)
+                    changed = []
+            Post.objects.bulk_update(changed, ["search_document"])
+            updated += len(changed)
+            search.rebuild_index()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Updated {updated} search document(s) and rebuilt the index."
+            )
+        )
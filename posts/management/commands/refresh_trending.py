@@ -0,0 +1,55 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from posts.trending import refresh_window
+
+
+class Command(BaseCommand):
+    """
+    Management command that refreshes the precomputed trending scores,
+    either once (e.g. from a scheduler) or, with --interval, as a
+    long-running process.
+    """
+    help = "Refresh trending post scores for the configured windows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--window",
+            action="append",
+            dest="windows",
+            help="Window to refresh (repeatable). Defaults to all windows.",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Rebuild the scores from scratch instead of incrementally.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=None,
+            help="Keep running, refreshing every INTERVAL seconds.",
+        )
+
+    def handle(self, *args, **options):
+        windows = options["windows"] or list(settings.TRENDING_WINDOWS)
+        for window in windows:
+            if window not in settings.TRENDING_WINDOWS:
+                raise CommandError(f"Unknown trending window '{window}'")
+        full = options["full"]
+        while True:
+            self.refresh(windows, full)
+            if options["interval"] is None:
+                break
+            # Only the first pass is a full rebuild.
+            full = False
+            time.sleep(options["interval"])
+
+    def refresh(self, windows, full):
+        for window in windows:
+            active = refresh_window(window, full=full)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Refreshed {window} trending: {active} active post(s)."
+                )
+            )
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.20 on 2026-10-18 07:33
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Like = apps.get_model('likes', 'Like')
+    Comment = apps.get_model('comments', 'Comment')
+
+    def count_of(model):
+        return Coalesce(
+            Subquery(
+                model.objects.filter(post=OuterRef('pk'))
+                .order_by()
+                .values('post')
+                .annotate(count=Count('pk'))
+                .values('count')
+            ),
+            0,
+        )
+
+    Post.objects.update(
+        likes_count=count_of(Like), comments_count=count_of(Comment)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0003_post_original_author'),
+        ('likes', '0001_initial'),
+        ('comments', '0003_alter_comment_options_comment_parent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['likes_count'], name='post_likes_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['comments_count'], name='post_comments_count_idx'),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
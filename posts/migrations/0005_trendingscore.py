@@ -0,0 +1,30 @@
+# Generated by Django 4.2.20 on 2026-10-18 07:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_post_comments_count_post_likes_count_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window', models.CharField(max_length=10)),
+                ('score', models.FloatField(default=0)),
+                ('last_activity_at', models.DateTimeField()),
+                ('computed_at', models.DateTimeField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trending_scores', to='posts.post')),
+            ],
+            options={
+                'ordering': ['window', '-score'],
+                'indexes': [models.Index(fields=['window', '-score'], name='trending_window_score_idx')],
+                'unique_together': {('post', 'window')},
+            },
+        ),
+    ]
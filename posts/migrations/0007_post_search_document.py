@@ -0,0 +1,51 @@
+# Generated by Django 4.2.20 on 2026-10-18 07:37
+
+from django.db import migrations, models
+from posts import search
+
+
+def populate_search_documents(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    posts = Post.objects.select_related('owner').prefetch_related(
+        'post_tags'
+    )
+    batch = []
+    for post in posts.iterator(chunk_size=500):
+        tags = ' '.join(tag.name for tag in post.post_tags.all())
+        post.search_document = ' '.join(
+            part
+            for part in [post.owner.username, post.title, post.content, tags]
+            if part
+        )
+        batch.append(post)
+        if len(batch) == 500:
+            Post.objects.bulk_update(batch, ['search_document'])
+            batch = []
+    Post.objects.bulk_update(batch, ['search_document'])
+
+
+def create_search_index(apps, schema_editor):
+    search.create_index(schema_editor)
+
+
+def drop_search_index(apps, schema_editor):
+    search.drop_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_post_post_created_id_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(
+            populate_search_documents, migrations.RunPython.noop
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.20 on 2026-10-18 07:40
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+def populate_excerpts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    batch = []
+    for post in Post.objects.exclude(content='').only('content').iterator():
+        post.excerpt = Truncator(post.content).words(50)
+        batch.append(post)
+        if len(batch) == 500:
+            Post.objects.bulk_update(batch, ['excerpt'])
+            batch = []
+    Post.objects.bulk_update(batch, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_timelineentry_post_fanned_out_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(populate_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.20 on 2026-10-18 07:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_post_excerpt_post_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('approval_status', 1)), fields=['-created_at', '-id'], name='post_reported_idx'),
+        ),
+    ]
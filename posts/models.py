@@ -1,6 +1,18 @@
+from django.conf import settings
 from django.db import models
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_save,
+)
 from django.contrib.auth.models import User
+from django.db.models.functions import Coalesce
 from django.utils.text import Truncator
+from followers.models import Follower
+from inspyre_api.cache import invalidate
+from profiles.models import Profile, profile_cache_scopes
+from . import search
 
 APPROVAL_STATUS = ((0, "Approved"), (1, "Reported"))
 
@@ -18,6 +30,81 @@ class PostTag(models.Model):
         return self.name
 
 
+class PostQuerySet(models.QuerySet):
+    """
+    QuerySet for the Post model, providing the joins and viewer-specific
+    state needed to serialize a page of posts in a fixed number of queries.
+    """
+    def with_related(self):
+        """
+        Join each post's owner and profile, and prefetch the post tags and
+        the owner's profile tags.
+        """
+        return self.select_related("owner__profile").prefetch_related(
+            "post_tags", "owner__profile__profile_tags"
+        )
+
+    def visible(self):
+        """
+        Exclude the posts of deactivated accounts, such as those awaiting
+        deletion.
+        """
+        return self.filter(owner__is_active=True)
+
+    def with_viewer_state(self, user):
+        """
+        Annotate each post with 'viewer_like_id', the id of the given user's
+        like on that post (or None). Anonymous users are left unannotated.
+        """
+        if not user.is_authenticated:
+            return self
+        like_model = self.model._meta.get_field("likes").related_model
+        return self.annotate(
+            viewer_like_id=models.Subquery(
+                like_model.objects.filter(
+                    owner=user, post=models.OuterRef("pk")
+                ).values("id")[:1]
+            )
+        )
+
+    def reconcile_counters(self):
+        """
+        Recompute 'likes_count' and 'comments_count' from the likes and
+        comments tables, updating only the posts whose stored counters have
+        drifted. Returns the number of posts repaired.
+        """
+        like_model = self.model._meta.get_field("likes").related_model
+        comment_model = self.model._meta.get_field("comment").related_model
+        actual_likes = _count_subquery(like_model)
+        actual_comments = _count_subquery(comment_model)
+        drifted = self.annotate(
+            actual_likes=actual_likes, actual_comments=actual_comments
+        ).exclude(
+            likes_count=models.F("actual_likes"),
+            comments_count=models.F("actual_comments"),
+        )
+        return self.filter(pk__in=drifted.values("pk")).update(
+            likes_count=actual_likes, comments_count=actual_comments
+        )
+
+
+def _count_subquery(model):
+    """
+    Return an expression counting the rows of 'model' that reference the
+    outer post, defaulting to 0.
+    """
+    return Coalesce(
+        models.Subquery(
+            model.objects.filter(post=models.OuterRef("pk"))
+            .order_by()
+            .values("post")
+            .annotate(count=models.Count("pk"))
+            .values("count")
+        ),
+        0,
+    )
+
+
 class Post(models.Model):
     """
     Model representing a post created by a user, which can include content,
@@ -35,6 +122,17 @@ class Post(models.Model):
         reported.
         original_author (bool): Flag indicating if the user is the original
         author.
+        likes_count (int): Stored number of likes, maintained by the Like
+        signals.
+        comments_count (int): Stored number of comments (including replies),
+        maintained by the Comment signals.
+        search_document (str): Denormalized text indexed for full-text
+        search, maintained by the signals below.
+        fanned_out (bool): Whether the post was copied into its followers'
+        timelines. Posts that were not are merged in when timelines are read.
+        excerpt (str): The content truncated to 50 words, stored on save.
+        image_variants (dict): Storage names of resized WebP copies of the
+        image, keyed by variant (see settings.POST_IMAGE_VARIANTS).
     """
     owner = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -54,21 +152,54 @@ class Post(models.Model):
         help_text="Check this box if you are the original creator of this "
         "content.",
     )
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+    search_document = models.TextField(blank=True, editable=False)
+    fanned_out = models.BooleanField(default=False, editable=False)
+    excerpt = models.TextField(blank=True, editable=False)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     def get_thumbnail_url(self):
         """
         Returns a URL for the post thumbnail.
-        If an image is available, its URL is returned.
+        If an image is available, the URL of its thumbnail variant is
+        returned, or of the original image until the variant is generated.
         If content is present but no image, a truncated content preview URL
         is returned.
         """
         if self.image:
+            thumbnail = self.image_variants.get("thumbnail")
+            if thumbnail:
+                return self.image.storage.url(thumbnail)
             return self.image.url
         elif self.content:
-            truncated_content = Truncator(self.content).words(50)
-            return f"/content-preview/{truncated_content}"
+            return f"/content-preview/{self.excerpt}"
         return None
 
+    def get_image_variant_urls(self):
+        """
+        Returns a dict mapping each generated image variant to its URL.
+        """
+        storage = self.image.storage
+        return {
+            variant: storage.url(name)
+            for variant, name in self.image_variants.items()
+        }
+
+    def build_search_document(self):
+        """
+        Returns the text indexed for full-text search: the owner's username,
+        the title, the content and the tag names.
+        """
+        tags = " ".join(tag.name for tag in self.post_tags.all())
+        return " ".join(
+            part
+            for part in [self.owner.username, self.title, self.content, tags]
+            if part
+        )
+
     @property
     def thumbnail(self):
         """
@@ -82,6 +213,264 @@ class Post(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["likes_count"], name="post_likes_count_idx"),
+            models.Index(
+                fields=["comments_count"], name="post_comments_count_idx"
+            ),
+            models.Index(
+                fields=["-created_at", "-id"], name="post_created_id_idx"
+            ),
+            models.Index(
+                fields=["owner", "-created_at", "-id"],
+                name="post_owner_created_id_idx",
+            ),
+            models.Index(
+                fields=["owner", "-created_at", "-id"],
+                condition=models.Q(fanned_out=False),
+                name="post_fan_out_on_read_idx",
+            ),
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(approval_status=1),
+                name="post_reported_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.id} {self.title}"
+
+
+def set_excerpt(sender, instance, **kwargs):
+    instance.excerpt = Truncator(instance.content).words(50)
+
+
+def update_search_document(sender, instance, **kwargs):
+    document = instance.build_search_document()
+    if document == instance.search_document:
+        return
+    Post.objects.filter(pk=instance.pk).update(search_document=document)
+    instance.search_document = document
+    search.index_post(instance.pk, document)
+
+
+def update_tagged_search_documents(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        update_search_document(Post, instance)
+    elif pk_set:
+        for post in Post.objects.filter(pk__in=pk_set).select_related("owner"):
+            update_search_document(Post, post)
+
+
+def remove_search_document(sender, instance, **kwargs):
+    search.unindex_post(instance.pk)
+
+
+def increment_posts_count(sender, instance, created, **kwargs):
+    if created:
+        Profile.objects.filter(owner_id=instance.owner_id).update(
+            posts_count=models.F("posts_count") + 1
+        )
+
+
+def decrement_posts_count(sender, instance, **kwargs):
+    Profile.objects.filter(
+        owner_id=instance.owner_id, posts_count__gt=0
+    ).update(posts_count=models.F("posts_count") - 1)
+
+
+def invalidate_post_cache(sender, instance, created=True, **kwargs):
+    """
+    Post lists change with every post, while profiles only show the number
+    of posts, which changes when one is created or deleted.
+    """
+    scopes = ["posts", f"post:{instance.pk}"]
+    if created:
+        scopes += ["profiles", *profile_cache_scopes(instance.owner_id)]
+    invalidate(*scopes)
+
+
+def invalidate_tagged_post_cache(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        invalidate("posts", f"post:{instance.pk}")
+    elif pk_set:
+        invalidate("posts", *(f"post:{pk}" for pk in pk_set))
+
+
+pre_save.connect(set_excerpt, sender=Post)
+post_save.connect(update_search_document, sender=Post)
+post_save.connect(invalidate_post_cache, sender=Post)
+post_save.connect(increment_posts_count, sender=Post)
+post_delete.connect(remove_search_document, sender=Post)
+post_delete.connect(decrement_posts_count, sender=Post)
+post_delete.connect(invalidate_post_cache, sender=Post)
+m2m_changed.connect(
+    update_tagged_search_documents, sender=Post.post_tags.through
+)
+m2m_changed.connect(
+    invalidate_tagged_post_cache, sender=Post.post_tags.through
+)
+
+
+class TrendingScore(models.Model):
+    """
+    Model storing a post's precomputed trending score within a time window,
+    refreshed by the 'refresh_trending' management command.
+
+    Attributes:
+        post (Post): The scored post.
+        window (str): The trending window, a key of settings.TRENDING_WINDOWS.
+        score (float): Time-decayed like and comment velocity.
+        last_activity_at (datetime): Hour of the latest counted activity.
+        computed_at (datetime): When the score was last decayed or updated.
+    """
+    post = models.ForeignKey(
+        Post, related_name="trending_scores", on_delete=models.CASCADE
+    )
+    window = models.CharField(max_length=10)
+    score = models.FloatField(default=0)
+    last_activity_at = models.DateTimeField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["window", "-score"]
+        unique_together = ["post", "window"]
+        indexes = [
+            models.Index(
+                fields=["window", "-score"], name="trending_window_score_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.post_id} {self.window} {self.score:.2f}"
+
+
+class TimelineEntryManager(models.Manager):
+    """
+    Manager for timeline entries, implementing fan-out on write with a
+    fan-out-on-read fallback for accounts with very large followings.
+    """
+    def fan_out(self, post):
+        """
+        Copy a new post into the timelines of its owner's followers and mark
+        it as fanned out. Owners with more than TIMELINE_FANOUT_THRESHOLD
+        followers (by their profile's stored count) are skipped, leaving the
+        post to be read on demand. Returns whether the post was fanned out.
+        """
+        followers_count = (
+            Profile.objects.filter(owner_id=post.owner_id)
+            .values_list("followers_count", flat=True)
+            .first()
+        )
+        if (followers_count or 0) > settings.TIMELINE_FANOUT_THRESHOLD:
+            return False
+        followers = Follower.objects.filter(followed_id=post.owner_id)
+        self.bulk_create(
+            [
+                self.model(
+                    user_id=user_id,
+                    post_id=post.pk,
+                    author_id=post.owner_id,
+                    created_at=post.created_at,
+                )
+                for user_id in followers.values_list("owner_id", flat=True)
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        Post.objects.filter(pk=post.pk).update(fanned_out=True)
+        post.fanned_out = True
+        return True
+
+    def backfill(self, user_id, author_id):
+        """
+        Copy an author's most recent fanned-out posts into a new follower's
+        timeline.
+        """
+        limit = settings.TIMELINE_BACKFILL_SIZE
+        posts = (
+            Post.objects.filter(owner_id=author_id, fanned_out=True)
+            .order_by("-created_at", "-id")
+            .values_list("id", "created_at")[:limit]
+        )
+        self.bulk_create(
+            [
+                self.model(
+                    user_id=user_id,
+                    post_id=post_id,
+                    author_id=author_id,
+                    created_at=created_at,
+                )
+                for post_id, created_at in posts
+            ],
+            ignore_conflicts=True,
+        )
+
+    def prune(self, user_id, author_id):
+        """
+        Remove an author's posts from a former follower's timeline.
+        """
+        self.filter(user_id=user_id, author_id=author_id).delete()
+
+
+class TimelineEntry(models.Model):
+    """
+    Model representing a post materialized into a follower's home timeline,
+    so that reading a timeline is a single range scan over
+    (user, created_at).
+
+    Attributes:
+        user (User): The follower whose timeline holds the entry.
+        post (Post): The post shown in the timeline.
+        author (User): The post's owner, used to prune entries on unfollow.
+        created_at (datetime): The post's creation time, copied for ordering.
+    """
+    user = models.ForeignKey(
+        User, related_name="timeline_entries", on_delete=models.CASCADE
+    )
+    post = models.ForeignKey(
+        Post, related_name="timeline_entries", on_delete=models.CASCADE
+    )
+    author = models.ForeignKey(
+        User, related_name="+", on_delete=models.CASCADE
+    )
+    created_at = models.DateTimeField()
+
+    objects = TimelineEntryManager()
+
+    class Meta:
+        ordering = ["-created_at", "-post"]
+        unique_together = ["user", "post"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-post"],
+                name="timeline_user_created_idx",
+            ),
+            models.Index(
+                fields=["user", "author"], name="timeline_user_author_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.post}"
+
+
+def backfill_timeline(sender, instance, created, **kwargs):
+    if created:
+        TimelineEntry.objects.backfill(instance.owner_id, instance.followed_id)
+
+
+def prune_timeline(sender, instance, **kwargs):
+    TimelineEntry.objects.prune(instance.owner_id, instance.followed_id)
+
+
+post_save.connect(backfill_timeline, sender=Follower)
+post_delete.connect(prune_timeline, sender=Follower)
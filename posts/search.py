@@ -0,0 +1,166 @@
+import re
+from django.db import connections
+from django.db.models import F, FloatField, Func, Value
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+SEARCH_CONFIG = "english"
+FTS_TABLE = "posts_post_fts"
+GIN_INDEX = "posts_post_search_gin"
+
+
+def _words(terms):
+    """
+    Reduce search terms to plain words, dropping query syntax characters.
+    """
+    return [word for term in terms for word in re.findall(r"\w+", term)]
+
+
+def create_index(schema_editor):
+    """
+    Create the full-text index for the current database: a GIN index over
+    the post search documents on PostgreSQL, or an FTS5 table on SQLite.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {GIN_INDEX} ON posts_post "
+            f"USING gin (to_tsvector('{SEARCH_CONFIG}', search_document))"
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            "USING fts5(search_document)"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, search_document) "
+            "SELECT id, search_document FROM posts_post"
+        )
+
+
+def drop_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {GIN_INDEX}")
+    elif vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def rebuild_index(using="default"):
+    """
+    Repopulate the FTS5 table on SQLite from the stored search documents.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, search_document) "
+            "SELECT id, search_document FROM posts_post"
+        )
+
+
+def index_post(post_id, document, using="default"):
+    """
+    Write a post's search document to the FTS5 table on SQLite. PostgreSQL
+    indexes the column directly, so nothing is needed there.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post_id]
+        )
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, search_document) "
+            "VALUES (%s, %s)",
+            [post_id, document],
+        )
+
+
+def unindex_post(post_id, using="default"):
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [post_id]
+        )
+
+
+def search_posts(queryset, terms):
+    """
+    Filter a post queryset to the posts whose search document contains
+    every term (as a word prefix), annotated with a relevance 'search_rank'
+    where higher is better.
+    """
+    words = _words(terms)
+    if not words:
+        return queryset.annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        ).none()
+    vendor = connections[queryset.db].vendor
+    if vendor == "postgresql":
+        from django.contrib.postgres.search import (
+            SearchQuery,
+            SearchRank,
+            SearchVectorField,
+        )
+
+        vector = Func(
+            F("search_document"),
+            function="to_tsvector",
+            template=f"%(function)s('{SEARCH_CONFIG}', %(expressions)s)",
+            output_field=SearchVectorField(),
+        )
+        query = SearchQuery(
+            " & ".join(f"{word}:*" for word in words),
+            config=SEARCH_CONFIG,
+            search_type="raw",
+        )
+        return (
+            queryset.annotate(search_vector=vector)
+            .filter(search_vector=query)
+            .annotate(search_rank=SearchRank(F("search_vector"), query))
+        )
+    if vendor == "sqlite":
+        match = " ".join(f'"{word}"*' for word in words)
+        table = queryset.model._meta.db_table
+        return queryset.filter(
+            pk__in=RawSQL(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                [match],
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id",
+                [match],
+                output_field=FloatField(),
+            )
+        )
+    for word in words:
+        queryset = queryset.filter(search_document__icontains=word)
+    return queryset.annotate(
+        search_rank=Value(0.0, output_field=FloatField())
+    )
+
+
+class PostSearchFilter(filters.SearchFilter):
+    """
+    Drop-in replacement for SearchFilter on post views, matching the
+    'search' parameter against each post's indexed search document instead
+    of OR-ing icontains lookups across joins. Results are ordered by
+    relevance unless an explicit ordering is requested.
+    """
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        queryset = search_posts(queryset, terms)
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by("-search_rank", "-created_at")
+        return queryset
@@ -1,5 +1,9 @@
 from rest_framework import serializers
+from inspyre_api.uploads import UploadedImageField
 from posts.models import Post, PostTag
+from posts.images import schedule_variants
+from posts.tags import parse_tag_names, set_tags
+from likes.buffer import pending_likes
 from likes.models import Like
 
 
@@ -13,6 +17,20 @@ class PostTagSerializer(serializers.ModelSerializer):
         fields = ["name"]
 
 
+class PostListSerializer(serializers.ListSerializer):
+    """
+    List serializer for posts that reads the buffered like deltas of all the
+    posts with a single pending_likes call, passing them to each post
+    through the 'pending_likes' context entry.
+    """
+    def to_representation(self, data):
+        posts = list(data.all() if hasattr(data, "all") else data)
+        self.context["pending_likes"] = pending_likes(
+            [post.pk for post in posts]
+        )
+        return super().to_representation(posts)
+
+
 class PostSerializer(serializers.ModelSerializer):
     """
     Serializer for the Post model, handling creation, updating, and validation
@@ -28,33 +46,16 @@ class PostSerializer(serializers.ModelSerializer):
         source="owner.profile.image.url"
     )
     profile_tags = serializers.SerializerMethodField()
+    image = UploadedImageField(required=False)
     like_id = serializers.SerializerMethodField()
-    likes_count = serializers.ReadOnlyField()
+    image_variants = serializers.SerializerMethodField()
+    likes_count = serializers.SerializerMethodField()
     comments_count = serializers.ReadOnlyField()
     post_tags = PostTagSerializer(many=True, read_only=True)
     tags = serializers.CharField(
         write_only=True, required=False, allow_blank=True
     )
 
-    def validate_image(self, value):
-        """
-        Validate the image size and dimensions.
-        Limits size to 2MB and dimensions to 4096x4096px.
-        """
-        if value.size > 2 * 1024 * 1024:
-            raise serializers.ValidationError(
-                "Image size larger than 2MB!"
-            )
-        if value.image.height > 4096:
-            raise serializers.ValidationError(
-                "Image height larger than 4096px!"
-            )
-        if value.image.width > 4096:
-            raise serializers.ValidationError(
-                "Image width larger than 4096px!"
-            )
-        return value
-
     def get_is_owner(self, obj):
         request = self.context["request"]
         return request.user == obj.owner
@@ -62,10 +63,25 @@ class PostSerializer(serializers.ModelSerializer):
     def get_like_id(self, obj):
         user = self.context["request"].user
         if user.is_authenticated:
+            if hasattr(obj, "viewer_like_id"):
+                return obj.viewer_like_id
             like = Like.objects.filter(owner=user, post=obj).first()
             return like.id if like else None
         return None
 
+    def get_likes_count(self, obj):
+        """
+        Return the stored count plus the buffered delta, taken from the
+        'pending_likes' context entry when it covers the post.
+        """
+        deltas = self.context.get("pending_likes", {})
+        if obj.pk not in deltas:
+            deltas = pending_likes([obj.pk])
+        return obj.likes_count + deltas[obj.pk]
+
+    def get_image_variants(self, obj):
+        return obj.get_image_variant_urls()
+
     def get_profile_tags(self, obj):
         return [tag.name for tag in obj.owner.profile.profile_tags.all()]
 
@@ -73,12 +89,9 @@ class PostSerializer(serializers.ModelSerializer):
         tags_str = validated_data.pop("tags", "")
         post = Post.objects.create(**validated_data)
         if tags_str:
-            tag_names = [
-                name.strip() for name in tags_str.split(",") if name.strip()
-            ]
-            for name in tag_names:
-                tag_obj, created = PostTag.objects.get_or_create(name=name)
-                post.post_tags.add(tag_obj)
+            set_tags(post, "post_tags", parse_tag_names(tags_str))
+        if post.image:
+            schedule_variants(post)
         return post
 
     def update(self, instance, validated_data):
@@ -89,15 +102,13 @@ class PostSerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
         instance.save()
 
+        # Regenerate image variants if a new image was uploaded
+        if "image" in validated_data:
+            schedule_variants(instance)
+
         # Update tags if 'tags' provided
         if tags_str is not None:
-            instance.post_tags.clear()
-            tag_names = [
-                name.strip() for name in tags_str.split(",") if name.strip()
-            ]
-            for name in tag_names:
-                tag_obj, created = PostTag.objects.get_or_create(name=name)
-                instance.post_tags.add(tag_obj)
+            set_tags(instance, "post_tags", parse_tag_names(tags_str))
 
         return instance
 
@@ -114,7 +125,9 @@ class PostSerializer(serializers.ModelSerializer):
             "updated_at",
             "title",
             "content",
+            "excerpt",
             "image",
+            "image_variants",
             "post_tags",
             "tags",
             "like_id",
@@ -122,3 +135,4 @@ class PostSerializer(serializers.ModelSerializer):
             "comments_count",
             "original_author",
         ]
+        list_serializer_class = PostListSerializer
@@ -0,0 +1,51 @@
+from django.db import transaction
+
+
+def parse_tag_names(tags_str):
+    """
+    Split a comma-separated tag string into stripped, de-duplicated names,
+    keeping their order.
+    """
+    return list(
+        dict.fromkeys(
+            name.strip() for name in tags_str.split(",") if name.strip()
+        )
+    )
+
+
+def resolve_tags(tag_model, names):
+    """
+    Return the tags with the given names in order, creating the missing ones
+    with a single bulk insert. Inserts that conflict with a tag created
+    concurrently are ignored and the tags are read back, so two requests
+    introducing the same tag both resolve to the same row.
+    """
+    if not names:
+        return []
+    tags = {tag.name: tag for tag in tag_model.objects.filter(name__in=names)}
+    missing = [name for name in names if name not in tags]
+    if missing:
+        tag_model.objects.bulk_create(
+            [tag_model(name=name) for name in missing], ignore_conflicts=True
+        )
+        tags.update(
+            (tag.name, tag)
+            for tag in tag_model.objects.filter(name__in=missing)
+        )
+    return [tags[name] for name in names]
+
+
+@transaction.atomic
+def set_tags(instance, field_name, names):
+    """
+    Make the tags in the many-to-many 'field_name' of 'instance' exactly the
+    tags called 'names', inserting and deleting only the rows of the
+    through table that change.
+    """
+    related = getattr(instance, field_name)
+    wanted = {tag.pk for tag in resolve_tags(related.model, names)}
+    current = set(related.values_list("pk", flat=True))
+    if current - wanted:
+        related.remove(*(current - wanted))
+    if wanted - current:
+        related.add(*(wanted - current))
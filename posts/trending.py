@@ -0,0 +1,170 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.db.models.functions import Greatest, TruncHour
+from django.db.models.signals import post_delete
+from django.utils import timezone
+from comments.models import Comment
+from likes.models import Like
+from .models import TrendingScore
+
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+TRENDING_SIZE = 10
+
+
+def cache_key(window):
+    return f"posts:trending:{window}"
+
+
+def half_life(window):
+    """
+    Return the half-life of activity within a window, a quarter of its
+    length.
+    """
+    return timedelta(hours=settings.TRENDING_WINDOWS[window]) / 4
+
+
+def decay(age, window):
+    """
+    Return the weight of activity that is 'age' old within a window.
+    """
+    return 0.5 ** (max(age, timedelta(0)) / half_life(window))
+
+
+def hourly_activity(model, since):
+    """
+    Return the number of 'model' rows created after 'since', grouped by
+    post and by hour.
+    """
+    return (
+        model.objects.filter(created_at__gt=since)
+        .order_by()
+        .annotate(hour=TruncHour("created_at"))
+        .values("post_id", "hour")
+        .annotate(count=Count("id"))
+    )
+
+
+def refresh_window(window, full=False):
+    """
+    Bring the trending scores of a window up to date and return the number
+    of posts with new activity.
+
+    Existing scores are decayed by the time elapsed since the previous
+    refresh, and only likes and comments created since then are read, so the
+    cost follows recent activity rather than the whole history. Posts with
+    no activity inside the window are dropped. A full refresh rebuilds the
+    window from scratch.
+    """
+    now = timezone.now()
+    start = now - timedelta(hours=settings.TRENDING_WINDOWS[window])
+    scores = TrendingScore.objects.filter(window=window)
+    last_refresh = None
+    if not full:
+        last_refresh = scores.aggregate(last=Max("computed_at"))["last"]
+    since = max(last_refresh, start) if last_refresh else start
+
+    added = {}
+    last_activity = {}
+    for model, weight in ((Like, LIKE_WEIGHT), (Comment, COMMENT_WEIGHT)):
+        for row in hourly_activity(model, since):
+            post_id = row["post_id"]
+            # Each hourly bucket is aged from its midpoint.
+            age = now - row["hour"] - timedelta(minutes=30)
+            weighted = weight * row["count"] * decay(age, window)
+            added[post_id] = added.get(post_id, 0) + weighted
+            last_activity[post_id] = max(
+                last_activity.get(post_id, row["hour"]), row["hour"]
+            )
+
+    with transaction.atomic():
+        if last_refresh is None:
+            scores.delete()
+        else:
+            scores.update(
+                score=F("score") * decay(now - last_refresh, window),
+                computed_at=now,
+            )
+            scores.filter(last_activity_at__lt=start).delete()
+        current = dict(
+            scores.filter(post_id__in=added).values_list("post_id", "score")
+        )
+        TrendingScore.objects.bulk_create(
+            [
+                TrendingScore(
+                    post_id=post_id,
+                    window=window,
+                    score=current.get(post_id, 0) + score,
+                    last_activity_at=last_activity[post_id],
+                    computed_at=now,
+                )
+                for post_id, score in added.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["post", "window"],
+            update_fields=["score", "last_activity_at", "computed_at"],
+        )
+    cache.delete(cache_key(window))
+    return len(added)
+
+
+def subtract_activity(post_id, created_at, weight):
+    """
+    Take a deleted like or comment back out of the scores that already
+    counted it, at the decay it has been given since. Activity that is
+    older than a window, or newer than its last refresh, needs no change.
+    """
+    now = timezone.now()
+    # Activity is aged from the midpoint of its hourly bucket.
+    bucket = created_at.replace(minute=30, second=0, microsecond=0)
+    for window, hours in settings.TRENDING_WINDOWS.items():
+        if created_at <= now - timedelta(hours=hours):
+            continue
+        scored = (
+            TrendingScore.objects.filter(
+                post_id=post_id, window=window, computed_at__gte=created_at
+            )
+            .values_list("pk", "computed_at")
+            .first()
+        )
+        if scored is None:
+            continue
+        pk, computed_at = scored
+        weighted = weight * decay(computed_at - bucket, window)
+        TrendingScore.objects.filter(pk=pk).update(
+            score=Greatest(F("score") - weighted, 0.0)
+        )
+
+
+def get_trending_post_ids(window):
+    """
+    Return the ids of the top approved posts in a window, highest score
+    first, served from the cache when possible.
+    """
+    key = cache_key(window)
+    post_ids = cache.get(key)
+    if post_ids is None:
+        post_ids = list(
+            TrendingScore.objects.filter(
+                window=window, post__approval_status=0
+            )
+            .order_by("-score")
+            .values_list("post_id", flat=True)[:TRENDING_SIZE]
+        )
+        cache.set(key, post_ids, settings.TRENDING_CACHE_TIMEOUT)
+    return post_ids
+
+
+def subtract_like(sender, instance, **kwargs):
+    subtract_activity(instance.post_id, instance.created_at, LIKE_WEIGHT)
+
+
+def subtract_comment(sender, instance, **kwargs):
+    subtract_activity(instance.post_id, instance.created_at, COMMENT_WEIGHT)
+
+
+post_delete.connect(subtract_like, sender=Like)
+post_delete.connect(subtract_comment, sender=Comment)
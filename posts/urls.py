@@ -4,6 +4,15 @@ from .views import trending_posts
 
 urlpatterns = [
     path("posts/", views.PostList.as_view()),
+    path("posts/feed/", views.PostFeed.as_view(), name="post-feed"),
+    path(
+        "posts/timeline/", views.PostTimeline.as_view(), name="post-timeline"
+    ),
     path("posts/<int:pk>/", views.PostDetail.as_view()),
+    path(
+        "posts/<int:pk>/report/",
+        views.ReportPost.as_view(),
+        name="post-report",
+    ),
     path("posts/trending/", trending_posts, name="post-trending"),
 ]
@@ -1,32 +1,39 @@
-from django.db.models import Count
-from rest_framework import generics, permissions, filters
+from django.conf import settings
+from django.db import transaction
+from rest_framework import generics, permissions, filters, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
+from inspyre_api.cache import AnonymousCacheMixin, get_versions
+from inspyre_api.conditional import ConditionalGetMixin, latest
+from inspyre_api.pagination import KeysetPagination
 from inspyre_api.permissions import IsOwnerOrReadOnly
-from .models import Post
+from likes.buffer import pending_likes
+from moderation.models import Report
+from .models import Post, TimelineEntry
+from .search import PostSearchFilter
 from .serializers import PostSerializer
+from .trending import get_trending_post_ids, TRENDING_SIZE
 
 
-class PostList(generics.ListCreateAPIView):
+class PostList(AnonymousCacheMixin, generics.ListCreateAPIView):
     """
     API view for listing and creating posts.
 
     - GET: Retrieve a list of posts with optional filtering, searching, and
     ordering.
     - POST: Create a new post associated with the authenticated user.
+
+    Anonymous GETs are served from the response cache.
     """
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    queryset = Post.objects.annotate(
-        comments_count=Count("comment", distinct=True),
-        likes_count=Count("likes", distinct=True),
-    ).order_by("-created_at")
 
     filter_backends = [
         filters.OrderingFilter,
-        filters.SearchFilter,
+        PostSearchFilter,
         DjangoFilterBackend,
     ]
     filterset_fields = [
@@ -34,6 +41,7 @@ class PostList(generics.ListCreateAPIView):
         "likes__owner__profile",
         "owner__profile",
         "owner__profile__profile_tags__name",
+        "approval_status",
     ]
     search_fields = [
         "owner__username",
@@ -47,11 +55,111 @@ class PostList(generics.ListCreateAPIView):
         "likes__created_at",
     ]
 
+    def get_cache_scopes(self):
+        """
+        Lists filtered or ordered on likes or follows also depend on those.
+        """
+        params = self.request.query_params
+        scopes = ["posts", "profile_data"]
+        for param, scope in (
+            ("likes__owner__profile", "likes"),
+            ("owner__followed__owner__profile", "following"),
+        ):
+            if params.get(param, "").isdigit():
+                scopes.append(f"{scope}:{int(params[param])}")
+        if "likes" in params.get("ordering", ""):
+            scopes.append("likes")
+        return scopes
+
+    def get_queryset(self):
+        return (
+            Post.objects.visible()
+            .with_related()
+            .with_viewer_state(self.request.user)
+            .order_by("-created_at")
+        )
+
+    @transaction.atomic
     def perform_create(self, serializer):
-        serializer.save(owner=self.request.user)
+        post = serializer.save(owner=self.request.user)
+        TimelineEntry.objects.fan_out(post)
+
+
+class PostFeed(generics.ListAPIView):
+    """
+    API view for infinite-scroll post feeds.
+
+    - GET: Retrieve posts newest first, with the same filters and search as
+    PostList, paginated by an opaque 'cursor' on (created_at, id) instead of
+    page numbers so that deep pages cost the same as the first.
+    """
+    serializer_class = PostSerializer
+    pagination_class = KeysetPagination
+    filter_backends = [
+        PostSearchFilter,
+        DjangoFilterBackend,
+    ]
+    filterset_fields = PostList.filterset_fields
+    search_fields = PostList.search_fields
+
+    def get_queryset(self):
+        return (
+            Post.objects.visible()
+            .with_related()
+            .with_viewer_state(self.request.user)
+        )
+
+
+class PostTimeline(generics.ListAPIView):
+    """
+    API view for the authenticated user's home timeline.
 
+    - GET: Retrieve posts from the users they follow, newest first and
+    paginated by cursor. Posts are read from the user's materialized
+    timeline and merged with posts that were not fanned out (e.g. from
+    accounts with very large followings).
+    """
+    serializer_class = PostSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        return (
+            Post.objects.visible()
+            .with_related()
+            .with_viewer_state(self.request.user)
+        )
+
+    def list(self, request, *args, **kwargs):
+        user = request.user
+        post_ids = self.paginator.paginate_positions(
+            [
+                (
+                    TimelineEntry.objects.filter(user=user),
+                    ("created_at", "post_id"),
+                ),
+                (
+                    Post.objects.filter(
+                        fanned_out=False, owner__followed__owner=user
+                    ),
+                    ("created_at", "id"),
+                ),
+            ],
+            request,
+        )
+        posts = self.get_queryset().in_bulk(post_ids)
+        serializer = self.get_serializer(
+            [posts[post_id] for post_id in post_ids if post_id in posts],
+            many=True,
+        )
+        return self.paginator.get_paginated_response(serializer.data)
 
-class PostDetail(generics.RetrieveUpdateDestroyAPIView):
+
+class PostDetail(
+    ConditionalGetMixin,
+    AnonymousCacheMixin,
+    generics.RetrieveUpdateDestroyAPIView,
+):
     """
     API view for retrieving, updating, or deleting a specific post.
 
@@ -59,26 +167,113 @@ class PostDetail(generics.RetrieveUpdateDestroyAPIView):
     - PUT/PATCH: Update the post content or associated data if the user is
     the owner.
     - DELETE: Delete the post if the user is the owner.
+
+    GETs are answered with 304 when the client's ETag or Last-Modified is
+    still current. Anonymous GETs are served from the response cache.
     """
     serializer_class = PostSerializer
     permission_classes = [IsOwnerOrReadOnly]
-    queryset = Post.objects.annotate(
-        comments_count=Count("comment", distinct=True),
-        likes_count=Count("likes", distinct=True),
-    ).order_by("-created_at")
+
+    def get_cache_scopes(self):
+        return (f"post:{self.kwargs['pk']}", "profile_data")
+
+    def get_conditional_state(self):
+        user = self.request.user
+        fields = [
+            "updated_at",
+            "owner__profile__updated_at",
+            "likes_count",
+            "comments_count",
+            "image_variants",
+        ]
+        if user.is_authenticated:
+            fields.append("viewer_like_id")
+        state = (
+            Post.objects.visible()
+            .filter(pk=self.kwargs["pk"])
+            .with_viewer_state(user)
+            .values_list(*fields)
+            .first()
+        )
+        if state is None:
+            return None
+        pk = self.kwargs["pk"]
+        scope = f"post:{pk}"
+        # Kept for the serializer, so the buffer is read once per request.
+        self.pending_likes = pending_likes([pk])
+        return (
+            state + (self.pending_likes[pk],),
+            latest(*state[:2], get_versions([scope])[scope]),
+        )
+
+    def get_queryset(self):
+        return (
+            Post.objects.visible()
+            .with_related()
+            .with_viewer_state(self.request.user)
+            .order_by("-created_at")
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if hasattr(self, "pending_likes"):
+            context["pending_likes"] = self.pending_likes
+        return context
+
+
+class ReportPost(APIView):
+    """
+    API view to handle reporting a post. Updates the post's approval status
+    to 'reported' and counts the report in the moderation queue.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def put(self, request, pk):
+        try:
+            post = Post.objects.get(pk=pk)
+        except Post.DoesNotExist:
+            return Response(
+                {"error": "Post not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        Report.objects.record(post)
+        return Response({"status": "post reported"}, status=status.HTTP_200_OK)
 
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def trending_posts(request):
     """
-    Retrieve the top 10 most liked, approved posts.
+    Retrieve the top 10 approved posts by precomputed trending score within
+    the window given by the 'window' query parameter (e.g. 24h or 7d).
+    Falls back to the most liked posts while a window has no scores.
     """
-    trending = (
-        Post.objects.filter(approval_status=0)
-        .annotate(likes_count=Count("likes", distinct=True))
-        .order_by("-likes_count")[:10]
+    window = request.query_params.get(
+        "window", settings.TRENDING_DEFAULT_WINDOW
+    )
+    if window not in settings.TRENDING_WINDOWS:
+        return Response(
+            {"error": f"Unknown trending window '{window}'"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    posts = (
+        Post.objects.visible()
+        .with_related()
+        .with_viewer_state(request.user)
     )
+    post_ids = get_trending_post_ids(window)
+    if post_ids:
+        # Posts reported since the ids were cached are left out.
+        posts_by_id = posts.filter(approval_status=0).in_bulk(post_ids)
+        trending = [
+            posts_by_id[post_id]
+            for post_id in post_ids
+            if post_id in posts_by_id
+        ]
+    else:
+        trending = posts.filter(approval_status=0).order_by(
+            "-likes_count"
+        )[:TRENDING_SIZE]
     serializer = PostSerializer(
         trending, many=True, context={"request": request}
     )
@@ -1,5 +1,21 @@
 from django.contrib import admin
-from .models import Profile, ProfileTag
+from .models import AccountDeletion, Profile, ProfileTag
 
 admin.site.register(Profile)
 admin.site.register(ProfileTag)
+
+
+@admin.register(AccountDeletion)
+class AccountDeletionAdmin(admin.ModelAdmin):
+    """
+    Admin list of account deletions and their progress.
+    """
+    list_display = [
+        "username",
+        "stage",
+        "progress",
+        "requested_at",
+        "completed_at",
+    ]
+    list_filter = ["stage"]
+    readonly_fields = ["user", "user_pk", "username", "progress"]
@@ -0,0 +1,205 @@
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from comments.models import Comment, subtree_range
+from direct_messages.models import DirectMessage
+from followers.models import Follower
+from inspyre_api.cache import invalidate
+from likes.models import Like
+from posts.models import Post, TimelineEntry
+from .models import AccountDeletion, Profile
+
+# How long a worker may hold a deletion between batches before another
+# worker may take it over.
+LEASE = timedelta(minutes=5)
+
+
+def delete_batch(queryset, batch_size):
+    """
+    Delete up to 'batch_size' rows of the queryset through the ORM, so that
+    the model's signals keep counters, caches and indexes up to date.
+    Returns the number of rows selected.
+    """
+    ids = list(
+        queryset.order_by("pk").values_list("pk", flat=True)[:batch_size]
+    )
+    if ids:
+        queryset.model.objects.filter(pk__in=ids).delete()
+    return len(ids)
+
+
+def delete_comments(user, batch_size):
+    """
+    Delete a batch of the comments by the user or on their posts, together
+    with replies by others below them. The deepest replies are deleted
+    first, so that no deletion cascades beyond the batch.
+    """
+    targets = Comment.objects.filter(Q(owner=user) | Q(post__owner=user))
+    roots = list(
+        targets.order_by("-depth", "-pk").values_list(
+            "pk", "post_id", "path"
+        )[:batch_size]
+    )
+    if not roots:
+        return 0
+    subtrees = Q()
+    for _, post_id, path in roots:
+        subtrees |= Q(post_id=post_id, **subtree_range(path))
+    replies = list(
+        Comment.objects.filter(subtrees)
+        .order_by("-depth", "-pk")
+        .values_list("pk", flat=True)[:batch_size]
+    )
+    if replies:
+        Comment.objects.filter(pk__in=replies).delete()
+        return len(replies)
+    return delete_batch(
+        Comment.objects.filter(pk__in=[pk for pk, _, _ in roots]), batch_size
+    )
+
+
+def delete_likes(user, batch_size):
+    return delete_batch(
+        Like.objects.filter(Q(owner=user) | Q(post__owner=user)), batch_size
+    )
+
+
+def delete_follows(user, batch_size):
+    return delete_batch(
+        Follower.objects.filter(Q(owner=user) | Q(followed=user)),
+        batch_size,
+    )
+
+
+def delete_timeline_entries(user, batch_size):
+    return delete_batch(
+        TimelineEntry.objects.filter(Q(user=user) | Q(author=user)),
+        batch_size,
+    )
+
+
+def detach_messages(user, batch_size):
+    """
+    Clear the user from a batch of the direct messages they sent or
+    received, as deleting the user would. The messages are kept for the
+    other participant.
+    """
+    detached = 0
+    for field in ("sender", "receiver"):
+        ids = list(
+            DirectMessage.objects.filter(**{field: user})
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size - detached]
+        )
+        DirectMessage.objects.filter(pk__in=ids).update(**{field: None})
+        detached += len(ids)
+        if detached >= batch_size:
+            break
+    return detached
+
+
+def delete_posts(user, batch_size):
+    return delete_batch(Post.objects.filter(owner=user), batch_size)
+
+
+# Stages in the order they are run. Dependents of the user's posts are
+# removed before the posts themselves so that no single delete cascades
+# into an unbounded number of rows, and timeline entries before follows so
+# that unfollowing has nothing left to prune.
+STAGES = [
+    ("comments", delete_comments),
+    ("likes", delete_likes),
+    ("timeline", delete_timeline_entries),
+    ("follows", delete_follows),
+    ("messages", detach_messages),
+    ("posts", delete_posts),
+]
+
+
+def request_deletion(user):
+    """
+    Deactivate the user and record their account deletion, returning it.
+    Repeated requests return the existing deletion. Deactivated accounts
+    are hidden from profile, post, comment, follow and username listings at
+    once, and their cached responses invalidated.
+    """
+    with transaction.atomic():
+        user.is_active = False
+        user.save(update_fields=["is_active"])
+        invalidate(
+            "usernames",
+            "posts",
+            "profiles",
+            "profile_data",
+            "comments",
+            *(
+                f"post_comments:{pk}"
+                for pk in Comment.objects.filter(owner=user)
+                .order_by()
+                .values_list("post_id", flat=True)
+                .distinct()
+            ),
+            *(
+                f"profile:{pk}"
+                for pk in Profile.objects.filter(owner=user).values_list(
+                    "pk", flat=True
+                )
+            ),
+        )
+        deletion, _ = AccountDeletion.objects.get_or_create(
+            user=user,
+            defaults={"user_pk": user.pk, "username": user.username},
+        )
+    return deletion
+
+
+def claim(deletion):
+    """
+    Take the lease on a pending deletion, returning False if another
+    worker holds it.
+    """
+    now = timezone.now()
+    return bool(
+        AccountDeletion.objects.filter(
+            Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+            pk=deletion.pk,
+            completed_at__isnull=True,
+        ).update(locked_until=now + LEASE)
+    )
+
+
+def process(deletion, batch_size=500, on_batch=None):
+    """
+    Carry out a claimed deletion in batches of at most 'batch_size' rows,
+    one transaction per batch, recording the stage and progress with each
+    batch so that an interrupted deletion resumes where it stopped. The
+    user is deleted once every stage is done. 'on_batch' is called with
+    the stage name and row count after each batch.
+    """
+    names = [name for name, _ in STAGES]
+    start = names.index(deletion.stage) if deletion.stage in names else 0
+    user = deletion.user
+    # The user may already be gone, e.g. deleted through the admin.
+    stages = STAGES[start:] if user is not None else []
+    for name, run in stages:
+        count = None
+        while count != 0:
+            with transaction.atomic():
+                count = run(user, batch_size)
+                deletion.stage = name
+                deletion.progress[name] = (
+                    deletion.progress.get(name, 0) + count
+                )
+                deletion.locked_until = timezone.now() + LEASE
+                deletion.save()
+            if on_batch is not None:
+                on_batch(name, count)
+    with transaction.atomic():
+        if user is not None:
+            user.delete()
+        deletion.user = None
+        deletion.stage = "done"
+        deletion.completed_at = timezone.now()
+        deletion.locked_until = None
+        deletion.save()
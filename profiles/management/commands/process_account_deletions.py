@@ -0,0 +1,68 @@
+import time
+from functools import partial
+from django.core.management.base import BaseCommand
+from profiles.deletion import claim, process
+from profiles.models import AccountDeletion
+
+
+class Command(BaseCommand):
+    """
+    Management command that carries out pending account deletions in
+    batches, either once (e.g. from a scheduler) or, with --interval, as a
+    long-running worker process. Interrupted deletions resume at the stage
+    they reached, and deletions held by another worker are skipped.
+    """
+    help = "Delete the accounts whose deletion has been requested."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Maximum number of rows deleted per transaction.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Maximum number of accounts to delete per run.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=None,
+            help="Keep running, checking for pending deletions every "
+            "INTERVAL seconds.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            self.run(options)
+            if options["interval"] is None:
+                break
+            time.sleep(options["interval"])
+
+    def run(self, options):
+        pending = AccountDeletion.objects.filter(completed_at__isnull=True)
+        completed = 0
+        for deletion in pending[:options["limit"]]:
+            if not claim(deletion):
+                continue
+            on_batch = (
+                partial(self.report_batch, deletion)
+                if options["verbosity"] > 1
+                else None
+            )
+            process(
+                deletion, batch_size=options["batch_size"], on_batch=on_batch
+            )
+            completed += 1
+            self.stdout.write(
+                f"Deleted {deletion.username}: {deletion.progress}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Completed {completed} account deletion(s).")
+        )
+
+    def report_batch(self, deletion, stage, count):
+        self.stdout.write(f"{deletion.username}: {stage} -{count}")
@@ -0,0 +1,101 @@
+import json
+import random
+import sys
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from profiles.models import ProfileTag
+from profiles.provisioning import provision_users
+
+
+class Command(BaseCommand):
+    """
+    Management command that creates users, profiles and profile tags in
+    bulk, either imported from a JSON Lines file (one user object per line,
+    as accepted by profiles.provisioning.provision_users) or generated for
+    benchmark datasets.
+    """
+    help = "Create users with their profiles in bulk."
+
+    def add_arguments(self, parser):
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument(
+            "--file",
+            help="JSON Lines file of users to import, or '-' for stdin.",
+        )
+        source.add_argument(
+            "--generate",
+            type=int,
+            help="Number of users to generate.",
+        )
+        parser.add_argument(
+            "--prefix",
+            default="user",
+            help="Username prefix of generated users.",
+        )
+        parser.add_argument(
+            "--password",
+            help="Password of every generated user, hashed once. Without "
+            "it generated users cannot log in.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed for the profile tags of generated users.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of users created per transaction.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of threads hashing plaintext passwords. Defaults "
+            "to the number of CPUs.",
+        )
+
+    def handle(self, *args, **options):
+        if options["file"]:
+            rows = self.read(options["file"])
+        else:
+            rows = self.generate(options)
+        try:
+            created, skipped = provision_users(
+                rows,
+                chunk_size=options["chunk_size"],
+                workers=options["workers"],
+            )
+        except (KeyError, ValueError) as error:
+            raise CommandError(f"Invalid user: {error}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {created} user(s), skipped {skipped} existing."
+            )
+        )
+
+    def read(self, path):
+        stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        with stream:
+            for number, line in enumerate(stream, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as error:
+                    raise CommandError(f"Line {number}: {error}")
+
+    def generate(self, options):
+        rng = random.Random(options["seed"])
+        tags = [name for name, _ in ProfileTag.profile_tags_choices]
+        password_hash = make_password(options["password"])
+        for i in range(options["generate"]):
+            username = f"{options['prefix']}{i}"
+            yield {
+                "username": username,
+                "password_hash": password_hash,
+                "name": username.title(),
+                "tags": rng.sample(tags, rng.randint(0, len(tags))),
+            }
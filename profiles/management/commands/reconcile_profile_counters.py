@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from profiles.models import Profile
+
+
+class Command(BaseCommand):
+    """
+    Management command that repairs drift in the stored 'posts_count',
+    'followers_count' and 'following_count' columns on profiles,
+    recomputing them from the posts and followers tables in batches of
+    profiles.
+    """
+    help = "Recompute stored post and follow counters on profiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of profiles checked per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = Profile.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+        repaired = 0
+        for start in range(0, last_id, batch_size):
+            with transaction.atomic():
+                repaired += Profile.objects.filter(
+                    id__gt=start, id__lte=start + batch_size
+                ).reconcile_counters()
+        self.stdout.write(
+            self.style.SUCCESS(f"Repaired counters on {repaired} profile(s).")
+        )
@@ -0,0 +1,69 @@
+# Generated by Django 4.2.20 on 2026-10-18 08:03
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Profile = apps.get_model('profiles', 'Profile')
+    Post = apps.get_model('posts', 'Post')
+    Follower = apps.get_model('followers', 'Follower')
+
+    def count_of(model, field):
+        return Coalesce(
+            Subquery(
+                model.objects.filter(**{field: OuterRef('owner')})
+                .order_by()
+                .values(field)
+                .annotate(count=Count('pk'))
+                .values('count')
+            ),
+            0,
+        )
+
+    Profile.objects.update(
+        posts_count=count_of(Post, 'owner'),
+        followers_count=count_of(Follower, 'followed'),
+        following_count=count_of(Follower, 'owner'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0005_alter_profile_image'),
+        ('posts', '0010_post_post_reported_idx'),
+        ('followers', '0002_follower_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['posts_count'], name='profile_posts_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['followers_count'], name='profile_followers_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['following_count'], name='profile_following_count_idx'),
+        ),
+    ]
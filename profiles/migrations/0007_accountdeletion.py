@@ -0,0 +1,35 @@
+# Generated by Django 4.2.20 on 2026-10-18 08:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('profiles', '0006_profile_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_pk', models.PositiveIntegerField()),
+                ('username', models.CharField(max_length=150)),
+                ('stage', models.CharField(blank=True, max_length=30)),
+                ('progress', models.JSONField(blank=True, default=dict)),
+                ('requested_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('user', models.OneToOneField(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='account_deletion', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['requested_at'],
+                'indexes': [models.Index(condition=models.Q(('completed_at__isnull', True)), fields=['requested_at'], name='account_deletion_pending_idx')],
+            },
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.contrib.auth.models import User
+from inspyre_api.cache import invalidate
 
 
 class ProfileTag(models.Model):
@@ -25,6 +27,86 @@ class ProfileTag(models.Model):
         return self.get_name_display()
 
 
+class ProfileQuerySet(models.QuerySet):
+    """
+    QuerySet for the Profile model, providing the joins and viewer-specific
+    state needed to serialize a page of profiles in a fixed number of
+    queries.
+    """
+    def with_related(self):
+        """
+        Join each profile's owner and prefetch its profile tags.
+        """
+        return self.select_related("owner").prefetch_related("profile_tags")
+
+    def visible(self):
+        """
+        Exclude the profiles of deactivated accounts, such as those awaiting
+        deletion.
+        """
+        return self.filter(owner__is_active=True)
+
+    def with_viewer_state(self, user):
+        """
+        Annotate each profile with 'viewer_following_id', the id of the
+        given user's follow of the profile's owner (or None). Anonymous users
+        are left unannotated.
+        """
+        if not user.is_authenticated:
+            return self
+        user_model = self.model._meta.get_field("owner").related_model
+        follower_model = user_model._meta.get_field("following").related_model
+        return self.annotate(
+            viewer_following_id=models.Subquery(
+                follower_model.objects.filter(
+                    owner=user, followed=models.OuterRef("owner")
+                ).values("id")[:1]
+            )
+        )
+
+    def reconcile_counters(self):
+        """
+        Recompute 'posts_count', 'followers_count' and 'following_count'
+        from the posts and followers tables, updating only the profiles
+        whose stored counters have drifted. Returns the number of profiles
+        repaired.
+        """
+        user_model = self.model._meta.get_field("owner").related_model
+        actual = {
+            "posts_count": _count_subquery(user_model, "post", "owner"),
+            "followers_count": _count_subquery(
+                user_model, "followed", "followed"
+            ),
+            "following_count": _count_subquery(
+                user_model, "following", "owner"
+            ),
+        }
+        drifted = self.annotate(
+            **{f"actual_{field}": count for field, count in actual.items()}
+        ).exclude(
+            **{field: models.F(f"actual_{field}") for field in actual}
+        )
+        return self.filter(pk__in=drifted.values("pk")).update(**actual)
+
+
+def _count_subquery(user_model, relation, field):
+    """
+    Return an expression counting the rows of the user model's reverse
+    'relation' whose 'field' is the outer profile's owner, defaulting to 0.
+    """
+    model = user_model._meta.get_field(relation).related_model
+    return Coalesce(
+        models.Subquery(
+            model.objects.filter(**{field: models.OuterRef("owner")})
+            .order_by()
+            .values(field)
+            .annotate(count=models.Count("pk"))
+            .values("count")
+        ),
+        0,
+    )
+
+
 class Profile(models.Model):
     """
     Model representing a user profile, extending the User model with
@@ -37,6 +119,12 @@ class Profile(models.Model):
         e.g., Writer, Artist.
         content (str): A brief bio or description of the user.
         image (ImageField): Profile image with a default placeholder.
+        posts_count (int): Stored number of posts by the owner, maintained
+        by the Post signals.
+        followers_count (int): Stored number of users following the owner,
+        maintained by the Follower signals.
+        following_count (int): Stored number of users the owner follows,
+        maintained by the Follower signals.
     """
     owner = models.OneToOneField(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -49,17 +137,107 @@ class Profile(models.Model):
     image = models.ImageField(
         upload_to="profile_images/", default="../ember_wv8ywv"
     )
+    posts_count = models.PositiveIntegerField(default=0, editable=False)
+    followers_count = models.PositiveIntegerField(default=0, editable=False)
+    following_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = ProfileQuerySet.as_manager()
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["posts_count"], name="profile_posts_count_idx"
+            ),
+            models.Index(
+                fields=["followers_count"], name="profile_followers_count_idx"
+            ),
+            models.Index(
+                fields=["following_count"], name="profile_following_count_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.owner}'s profile"
 
 
+class AccountDeletion(models.Model):
+    """
+    Model representing a requested account deletion, carried out in batches
+    by the 'process_account_deletions' management command. The user is
+    deactivated when the deletion is requested.
+
+    Attributes:
+        user (User): The user being deleted, cleared once they are gone.
+        user_pk (int): The id of the user being deleted.
+        username (str): The username at the time of the request.
+        stage (str): The stage of profiles.deletion.STAGES in progress.
+        progress (dict): Number of rows processed per stage.
+        requested_at (datetime): When the deletion was requested.
+        updated_at (datetime): When the last batch was processed.
+        completed_at (datetime): When the user was finally deleted.
+        locked_until (datetime): End of the lease of the worker processing
+        the deletion, so that concurrent workers skip it.
+    """
+    user = models.OneToOneField(
+        User,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="account_deletion",
+    )
+    user_pk = models.PositiveIntegerField()
+    username = models.CharField(max_length=150)
+    stage = models.CharField(max_length=30, blank=True)
+    progress = models.JSONField(default=dict, blank=True)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["requested_at"]
+        indexes = [
+            models.Index(
+                fields=["requested_at"],
+                condition=models.Q(completed_at__isnull=True),
+                name="account_deletion_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Deletion of {self.username}"
+
+
 def create_profile(sender, instance, created, **kwargs):
     if created:
         Profile.objects.create(owner=instance)
 
 
+def profile_cache_scopes(*user_ids, scope="profile"):
+    """
+    Return the response cache scopes of the profiles of the given users, or
+    their scopes named 'scope' (e.g. "following" for "following:<pk>").
+    """
+    return [
+        f"{scope}:{pk}"
+        for pk in Profile.objects.filter(owner_id__in=user_ids).values_list(
+            "pk", flat=True
+        )
+    ]
+
+
+def invalidate_profile_cache(sender, instance, **kwargs):
+    invalidate("profiles", "profile_data", f"profile:{instance.pk}")
+
+
+def invalidate_tagged_profile_cache(sender, instance, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate("profiles", "profile_data")
+
+
 post_save.connect(create_profile, sender=User)
+post_save.connect(invalidate_profile_cache, sender=Profile)
+post_delete.connect(invalidate_profile_cache, sender=Profile)
+m2m_changed.connect(
+    invalidate_tagged_profile_cache, sender=Profile.profile_tags.through
+)
@@ -0,0 +1,174 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from inspyre_api.cache import invalidate
+from posts.tags import resolve_tags
+from .models import Profile, ProfileTag
+
+USER_FIELDS = ["email", "first_name", "last_name", "date_joined"]
+PROFILE_FIELDS = ["name", "content", "image"]
+
+
+def chunked(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def provision_users(rows, chunk_size=1000, workers=None):
+    """
+    Create users with their profiles and profile tags from an iterable of
+    dicts, a chunk at a time with one bulk insert per table, instead of a
+    save and a create_profile signal per user.
+
+    Each row needs a 'username' and may give the User fields in USER_FIELDS,
+    the Profile fields in PROFILE_FIELDS and 'tags', a list of profile tag
+    names. 'password' is hashed; 'password_hash' is stored as is (e.g. a
+    hash imported from another platform, in a format Django understands);
+    without either the password is unusable. Passwords are hashed by
+    'workers' threads (one per CPU by default), as PBKDF2 runs outside the
+    GIL.
+
+    Usernames that already exist, or repeat an earlier row, are skipped.
+    Each chunk is its own transaction. Returns the numbers of users created
+    and skipped.
+    """
+    with ThreadPoolExecutor(workers or os.cpu_count()) as executor:
+        return _provision_users(rows, chunk_size, executor)
+
+
+def _provision_users(rows, chunk_size, executor):
+    valid_tags = {name for name, _ in ProfileTag.profile_tags_choices}
+    created = skipped = 0
+    seen = set()
+    for chunk in chunked(rows, chunk_size):
+        with transaction.atomic():
+            usernames = [row["username"] for row in chunk]
+            seen.update(
+                User.objects.filter(username__in=usernames).values_list(
+                    "username", flat=True
+                )
+            )
+            new_rows = []
+            for row in chunk:
+                if row["username"] in seen:
+                    skipped += 1
+                    continue
+                seen.add(row["username"])
+                unknown = set(row.get("tags", ())) - valid_tags
+                if unknown:
+                    raise ValueError(
+                        f"Unknown profile tags for {row['username']}: "
+                        f"{', '.join(sorted(unknown))}"
+                    )
+                new_rows.append(row)
+            users = dict(
+                zip(
+                    [row["username"] for row in new_rows],
+                    executor.map(build_user, new_rows),
+                )
+            )
+            taken = insert_users(users)
+            skipped += len(taken)
+            seen.update(taken)
+            new_rows = [row for row in new_rows if row["username"] in users]
+            if not new_rows:
+                continue
+            user_ids = dict(
+                User.objects.filter(
+                    username__in=[row["username"] for row in new_rows]
+                ).values_list("username", "pk")
+            )
+            Profile.objects.bulk_create(
+                [
+                    Profile(
+                        owner_id=user_ids[row["username"]],
+                        **{
+                            field: row[field]
+                            for field in PROFILE_FIELDS
+                            if field in row
+                        },
+                    )
+                    for row in new_rows
+                ],
+                ignore_conflicts=True,
+            )
+            assign_tags(new_rows, user_ids)
+            created += len(new_rows)
+    if created:
+        invalidate("usernames", "profiles", "profile_data")
+    return created, skipped
+
+
+def insert_users(users):
+    """
+    Insert the users, given by username, with one bulk insert. Users whose
+    usernames were taken concurrently since they were checked are removed
+    from 'users' and the insert retried, so that every user left was
+    created here. Returns the usernames taken.
+    """
+    taken = set()
+    while users:
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users.values())
+            break
+        except IntegrityError:
+            conflicts = set(
+                User.objects.filter(username__in=users).values_list(
+                    "username", flat=True
+                )
+            )
+            if not conflicts:
+                raise
+            for username in conflicts:
+                del users[username]
+            taken |= conflicts
+    return taken
+
+
+def build_user(row):
+    user = User(
+        username=row["username"],
+        **{field: row[field] for field in USER_FIELDS if field in row},
+    )
+    if row.get("password_hash"):
+        user.password = row["password_hash"]
+    else:
+        user.password = make_password(row.get("password"))
+    return user
+
+
+def assign_tags(rows, user_ids):
+    """
+    Give the profiles of the provisioned users their tags with one bulk
+    insert into the through table.
+    """
+    names = sorted({name for row in rows for name in row.get("tags", ())})
+    if not names:
+        return
+    tag_ids = {tag.name: tag.pk for tag in resolve_tags(ProfileTag, names)}
+    profile_ids = dict(
+        Profile.objects.filter(owner_id__in=user_ids.values())
+        .order_by()
+        .values_list("owner_id", "pk")
+    )
+    through = Profile.profile_tags.through
+    through.objects.bulk_create(
+        [
+            through(
+                profile_id=profile_ids[user_ids[row["username"]]],
+                profiletag_id=tag_ids[name],
+            )
+            for row in rows
+            for name in dict.fromkeys(row.get("tags", ()))
+        ],
+        ignore_conflicts=True,
+    )
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from inspyre_api.uploads import UploadedImageField
 from .models import Profile
 from followers.models import Follower
 from .models import ProfileTag
@@ -28,6 +29,7 @@ class ProfileSerializer(serializers.ModelSerializer):
     posts_count = serializers.ReadOnlyField()
     followers_count = serializers.ReadOnlyField()
     following_count = serializers.ReadOnlyField()
+    image = UploadedImageField(required=False)
     profile_tags = serializers.PrimaryKeyRelatedField(
         queryset=ProfileTag.objects.all(), many=True, write_only=True
     )
@@ -42,6 +44,8 @@ class ProfileSerializer(serializers.ModelSerializer):
     def get_following_id(self, obj):
         user = self.context["request"].user
         if user.is_authenticated:
+            if hasattr(obj, "viewer_following_id"):
+                return obj.viewer_following_id
             following = Follower.objects.filter(
                 owner=user, followed=obj.owner
             ).first()
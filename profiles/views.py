@@ -1,10 +1,12 @@
-from django.db.models import Count
 from rest_framework import generics, filters, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
-from django.contrib.auth.models import User
+from inspyre_api.cache import AnonymousCacheMixin, get_versions
+from inspyre_api.conditional import ConditionalGetMixin, latest
+from inspyre_api.pagination import PageOrKeysetPagination
 from inspyre_api.permissions import IsOwnerOrReadOnly
+from .deletion import request_deletion
 from .models import Profile
 from .serializers import ProfileSerializer, ProfileTagSerializer
 from .models import ProfileTag
@@ -20,18 +22,15 @@ class ProfileTagListView(generics.ListAPIView):
     serializer_class = ProfileTagSerializer
 
 
-class ProfileList(generics.ListAPIView):
+class ProfileList(AnonymousCacheMixin, generics.ListAPIView):
     """
     API view for listing all profiles.
 
-    - GET: Retrieve all profiles with annotation for post, follower, and
-    following counts.
+    - GET: Retrieve all profiles with their stored post, follower, and
+    following counts, which can be ordered on. Anonymous requests are served
+    from the response cache.
     """
-    queryset = Profile.objects.annotate(
-        posts_count=Count("owner__post", distinct=True),
-        followers_count=Count("owner__followed", distinct=True),
-        following_count=Count("owner__following", distinct=True),
-    ).order_by("-created_at")
+    queryset = Profile.objects.visible().order_by("-created_at")
     serializer_class = ProfileSerializer
     filter_backends = [
         filters.OrderingFilter,
@@ -49,57 +48,131 @@ class ProfileList(generics.ListAPIView):
         "owner__followed__created_at",
     ]
 
+    def get_cache_scopes(self):
+        """
+        Lists filtered or ordered on follows also depend on those.
+        """
+        params = self.request.query_params
+        scopes = ["profiles"]
+        for param, scope in (
+            ("owner__following__followed__profile", "followers"),
+            ("owner__followed__owner__profile", "following"),
+        ):
+            if params.get(param, "").isdigit():
+                scopes.append(f"{scope}:{int(params[param])}")
+        if "follow" in params.get("ordering", ""):
+            scopes.append("follows")
+        return scopes
 
-class ProfileDetail(generics.RetrieveUpdateAPIView):
+    def get_queryset(self):
+        return (
+            super()
+            .get_queryset()
+            .with_related()
+            .with_viewer_state(self.request.user)
+        )
+
+
+class ProfileDetail(
+    ConditionalGetMixin,
+    AnonymousCacheMixin,
+    generics.RetrieveUpdateAPIView,
+):
     """
     API view for retrieving or updating a profile if the user is the owner.
+    GETs are answered with 304 when the client's ETag or Last-Modified is
+    still current. Anonymous GETs are served from the response cache.
     """
     permission_classes = [IsOwnerOrReadOnly]
-    queryset = Profile.objects.annotate(
-        posts_count=Count("owner__post", distinct=True),
-        followers_count=Count("owner__followed", distinct=True),
-        following_count=Count("owner__following", distinct=True),
-    ).order_by("-created_at")
+    queryset = Profile.objects.visible().order_by("-created_at")
     serializer_class = ProfileSerializer
 
+    def get_cache_scopes(self):
+        return (f"profile:{self.kwargs['pk']}",)
+
+    def get_queryset(self):
+        return (
+            super()
+            .get_queryset()
+            .with_related()
+            .with_viewer_state(self.request.user)
+        )
+
+    def get_conditional_state(self):
+        fields = [
+            "updated_at",
+            "posts_count",
+            "followers_count",
+            "following_count",
+        ]
+        profiles = Profile.objects.visible().filter(pk=self.kwargs["pk"])
+        if self.request.user.is_authenticated:
+            profiles = profiles.with_viewer_state(self.request.user)
+            fields.append("viewer_following_id")
+        state = profiles.values_list(*fields).first()
+        if state is None:
+            return None
+        scope = f"profile:{self.kwargs['pk']}"
+        return state, latest(state[0], get_versions([scope])[scope])
+
 
 class UserDeleteView(APIView):
     """
     API view for deleting the authenticated user's account.
+
+    - DELETE: Deactivate the account at once and queue its deletion, which
+    the 'process_account_deletions' command carries out in batches.
     """
     permission_classes = [permissions.IsAuthenticated]
 
     def delete(self, request, *args, **kwargs):
-        user = request.user
-        user.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        deletion = request_deletion(request.user)
+        return Response(
+            {"id": deletion.pk, "requested_at": deletion.requested_at},
+            status=status.HTTP_202_ACCEPTED,
+        )
 
 
-class FollowersListView(generics.ListAPIView):
+class FollowListView(generics.ListAPIView):
     """
-    API view for listing the followers of a user by user ID.
+    Base API view listing the users on one side of a user's follows,
+    most recently followed first, paginated by page number or, when a
+    'cursor' parameter is given, by cursor. Pages are read from the
+    followers table with the listed users and their profiles joined, using
+    the (user, created_at, id) follower indexes. Follows of or by accounts
+    pending deletion are left out.
     """
     serializer_class = UserMiniSerializer
+    pagination_class = PageOrKeysetPagination
+    # The Follower field filtered on the user, and the one listed.
+    user_field = None
+    listed_field = None
 
     def get_queryset(self):
-        user_id = self.kwargs["pk"]
-        follower_ids = Follower.objects.filter(
-            followed__id=user_id
-        ).values_list(
-            "owner", flat=True
-        )
-        return User.objects.filter(id__in=follower_ids)
+        return Follower.objects.filter(
+            owner__is_active=True,
+            followed__is_active=True,
+            **{f"{self.user_field}_id": self.kwargs["pk"]},
+        ).select_related(f"{self.listed_field}__profile")
+
+    def list(self, request, *args, **kwargs):
+        follows = self.paginate_queryset(self.get_queryset())
+        users = [getattr(follow, self.listed_field) for follow in follows]
+        serializer = self.get_serializer(users, many=True)
+        return self.get_paginated_response(serializer.data)
 
 
-class FollowingListView(generics.ListAPIView):
+class FollowersListView(FollowListView):
     """
-    API view for listing the users that a user is following by user ID.
+    API view for listing the followers of a user by user ID.
     """
-    serializer_class = UserMiniSerializer
+    user_field = "followed"
+    listed_field = "owner"
 
-    def get_queryset(self):
-        user_id = self.kwargs["pk"]
-        following_ids = Follower.objects.filter(owner__id=user_id).values_list(
-            "followed", flat=True
-        )
-        return User.objects.filter(id__in=following_ids)
+
+class FollowingListView(FollowListView):
+    """
+    API view for listing the users that a user is following by user ID.
+    """
+    user_field = "owner"
+    listed_field = "followed"